@@ -4,163 +4,391 @@ GitHub Copilot Metrics - 数据分析示例
 演示如何使用生成的 CSV 文件进行数据分析
 """
 
+import importlib.util
+import io
+import sys
+
+import numpy as np
 import pandas as pd
-import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+# polars / numba 只检查是否已安装，真正导入推迟到数据量达到对应阈值时（导入本身需数百毫秒）
+HAS_POLARS = importlib.util.find_spec('polars') is not None
+HAS_NUMBA = importlib.util.find_spec('numba') is not None
+
+# 分组求和引擎按行数选择：超过 POLARS_MIN_ROWS 用 Polars 多线程引擎，
+# 超过 NUMBA_MIN_ROWS 用 numba 内核，其余用 factorize + reduceat
+POLARS_MIN_ROWS = 1_000_000
+NUMBA_MIN_ROWS = 50_000
+
+# CSV 列类型（显式指定，避免 pandas 逐列推断）
+STRING_COLUMNS = ['user_id', 'user_login', 'day', 'feature', 'language', 'ide', 'model']
+INT_COLUMNS = [
+    'user_initiated_interaction_count',
+    'code_generation_activity_count',
+    'code_acceptance_activity_count',
+    'loc_suggested_to_add_sum',
+    'loc_suggested_to_delete_sum',
+    'loc_added_sum',
+    'loc_deleted_sum',
+]
+FLOAT_COLUMNS = ['acceptance_rate', 'adoption_rate']
+BOOL_COLUMNS = ['used_agent', 'used_chat']
+# 低基数字符串列，转为 category 后 groupby 基于整数编码
+CATEGORY_COLUMNS = ['feature', 'language', 'ide', 'model', 'user_login']
+# 各维度分析共用的度量列
+MEASURES = [
+    'code_generation_activity_count',
+    'code_acceptance_activity_count',
+    'loc_suggested_to_add_sum',
+    'loc_added_sum',
+    'user_initiated_interaction_count',
+]
+
+# 各分析函数实际用到的列（读取时只解析这些列）
+USER_SUMMARY_COLUMNS = (
+    'user_login', 'day',
+    'user_initiated_interaction_count', 'code_generation_activity_count',
+    'code_acceptance_activity_count', 'loc_suggested_to_add_sum',
+    'loc_added_sum', 'loc_deleted_sum',
+    'acceptance_rate', 'adoption_rate', 'used_agent', 'used_chat',
+)
+FEATURE_COLUMNS = (
+    'feature', 'code_generation_activity_count', 'code_acceptance_activity_count',
+    'loc_suggested_to_add_sum', 'loc_added_sum',
+)
+LANGUAGE_COLUMNS = (
+    'language', 'code_generation_activity_count', 'code_acceptance_activity_count',
+    'loc_suggested_to_add_sum', 'loc_added_sum',
+)
+IDE_COLUMNS = (
+    'ide', 'user_initiated_interaction_count', 'code_generation_activity_count',
+    'code_acceptance_activity_count', 'loc_added_sum',
+)
+MODEL_COLUMNS = (
+    'model', 'user_initiated_interaction_count', 'code_generation_activity_count',
+    'code_acceptance_activity_count', 'loc_suggested_to_add_sum', 'loc_added_sum',
+)
+
+
+def _csv_dtypes(engine: str) -> dict:
+    """按解析引擎生成列类型映射（pyarrow 引擎使用 Arrow 类型，C 引擎使用可空扩展类型）
+
+    两种类型都允许空单元格（记为缺失值），不会因个别空值导致整个文件读取失败
+    """
+    if engine == 'pyarrow':
+        schema = ((STRING_COLUMNS, 'string[pyarrow]'), (INT_COLUMNS, 'int64[pyarrow]'),
+                  (FLOAT_COLUMNS, 'float64[pyarrow]'), (BOOL_COLUMNS, 'bool[pyarrow]'))
+    else:
+        schema = ((STRING_COLUMNS, 'string'), (INT_COLUMNS, 'Int64'),
+                  (FLOAT_COLUMNS, 'float64'), (BOOL_COLUMNS, 'boolean'))
+    dtypes = {}
+    for columns, dtype in schema:
+        dtypes.update(dict.fromkeys(columns, dtype))
+    return dtypes
+
+
+def _parquet_cache_path(csv_path: Path) -> Path:
+    """CSV 对应的 Parquet 缓存路径（隐藏文件，避免与 json_to_csv.py -f parquet 的导出文件同名）"""
+    return csv_path.with_name(f'.{csv_path.stem}.analyze-cache.parquet')
+
+
+def _load_via_parquet_cache(csv_file: str, usecols: list = None) -> pd.DataFrame:
+    """通过 Parquet 缓存读取 CSV：缓存过期或缺少所需列时只解析所需列并重写缓存"""
+    csv_path = Path(csv_file)
+    cache_path = _parquet_cache_path(csv_path)
+    try:
+        if cache_path.stat().st_mtime >= csv_path.stat().st_mtime:
+            cached_columns = pq.read_schema(cache_path).names
+            if usecols is None or set(usecols) <= set(cached_columns):
+                return pd.read_parquet(cache_path, engine='pyarrow', columns=usecols,
+                                       dtype_backend='pyarrow')
+    except (OSError, pa.ArrowInvalid):
+        pass  # 缓存不存在或已损坏时重新解析 CSV
+
+    df = pd.read_csv(csv_file, engine='pyarrow', dtype_backend='pyarrow',
+                     dtype=_csv_dtypes('pyarrow'), usecols=usecols)
+    # 先写临时文件再原子替换，中途失败不会留下不完整的缓存
+    temp_path = cache_path.with_name(cache_path.name + '.tmp')
+    try:
+        df.to_parquet(temp_path, engine='pyarrow', compression='zstd', index=False)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass  # 输出目录不可写时仅跳过缓存
+    return df
+
+
+@lru_cache(maxsize=None)
+def load_csv(csv_file: str, usecols: tuple = None) -> pd.DataFrame:
+    """读取 CSV 文件（同一文件只解析一次，usecols 指定时只解析所需列）"""
+    usecols = list(usecols) if usecols else None
+    if CSV_ENGINE == 'pyarrow':
+        df = _load_via_parquet_cache(csv_file, usecols)
+    else:
+        df = pd.read_csv(csv_file, engine='c', memory_map=True, dtype=_csv_dtypes('c'),
+                         usecols=usecols)
+    return _optimise_dtypes(df)
+
+
+def _optimise_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """低基数字符串列转为 category，数值列压缩到最小类型"""
+    category_columns = [c for c in CATEGORY_COLUMNS if c in df.columns]
+    if category_columns:
+        df[category_columns] = df[category_columns].astype('category')
+
+    # 数值列压缩到能容纳数据的最小类型，减少求和/均值时的内存带宽
+    for column in INT_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], downcast='unsigned')
+    for column in FLOAT_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], downcast='float')
+    return df
+
+
+def group_sum(keys: pd.Series, values: pd.DataFrame) -> pd.DataFrame:
+    """基于 factorize + np.add.reduceat 的分组求和（组顺序同 groupby(sort=False)，忽略缺失键，缺失值按 0 计）"""
+    codes, uniques = pd.factorize(keys, sort=False)
+    valid = np.flatnonzero(codes >= 0)
+    order = valid[np.argsort(codes[valid], kind='stable')]
+    sorted_codes = codes[order]
+    index = pd.Index(uniques, name=keys.name)
+    if not len(order):
+        return pd.DataFrame({col: np.zeros(0, dtype='int64') for col in values.columns}, index=index[:0])
 
-def analyze_user_summary(csv_file: str):
+    boundaries = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    sums = {
+        col: np.add.reduceat(values[col].to_numpy(dtype='int64', na_value=0)[order], boundaries)
+        for col in values.columns
+    }
+    return pd.DataFrame(sums, index=index[sorted_codes[boundaries]])
+
+
+@lru_cache(maxsize=None)
+def _numba_group_sum_kernel():
+    """首次使用时导入 numba 并编译分组求和内核（cache=True 时从磁盘缓存加载）"""
+    from numba import njit
+
+    # 逐行累加到共享输出会产生写冲突，因此不使用 prange 并行
+    @njit('int64[:, :](int64[:], int64[:, :], int64)', cache=True)
+    def kernel(codes, values, ngroups):
+        out = np.zeros((ngroups, values.shape[1]), dtype=np.int64)
+        for i in range(values.shape[0]):
+            c = codes[i]
+            if c < 0:
+                continue
+            for j in range(values.shape[1]):
+                out[c, j] += values[i, j]
+        return out
+
+    return kernel
+
+
+def numba_group_sum(keys: pd.Series, values: pd.DataFrame) -> pd.DataFrame:
+    """使用 numba 内核一次扫描完成所有度量列的分组求和（组顺序同 groupby(sort=False)，缺失值按 0 计）"""
+    codes, uniques = pd.factorize(keys, sort=False)
+    sums = _numba_group_sum_kernel()(
+        codes.astype(np.int64), values.to_numpy(dtype='int64', na_value=0), len(uniques)
+    )
+    return pd.DataFrame(sums, index=pd.Index(uniques, name=keys.name), columns=values.columns)
+
+
+def polars_group_sum(keys: pd.Series, values: pd.DataFrame) -> pd.DataFrame:
+    """使用 Polars 多线程引擎完成分组求和（maintain_order 保持首次出现顺序）"""
+    import polars as pl
+
+    measures = list(values.columns)
+    stats = (
+        pl.from_pandas(pd.concat([keys, values], axis=1))
+        .lazy()
+        .filter(pl.col(keys.name).is_not_null())
+        .group_by(keys.name, maintain_order=True)
+        .agg(pl.col(measures).sum())
+        .collect()
+        .to_pandas()
+    )
+    return stats.set_index(keys.name)
+
+
+def summarize(df: pd.DataFrame, by: str) -> pd.DataFrame:
+    """按维度对度量列求和（单次分组）"""
+    measures = [c for c in MEASURES if c in df.columns]
+    if HAS_POLARS and len(df) > POLARS_MIN_ROWS:
+        return polars_group_sum(df[by], df[measures])
+    if HAS_NUMBA and len(df) > NUMBA_MIN_ROWS:
+        return numba_group_sum(df[by], df[measures])
+    return group_sum(df[by], df[measures])
+
+
+def with_acceptance_rate(stats: pd.DataFrame) -> pd.DataFrame:
+    """追加向量化计算的接受率列（代码生成次数为 0 时记为 0）"""
+    gen = stats['code_generation_activity_count']
+    rate = stats['code_acceptance_activity_count'].div(gen).mul(100).where(gen > 0, 0.0)
+    return stats.assign(acceptance_rate=rate)
+
+
+def format_measures(stats: pd.DataFrame) -> pd.DataFrame:
+    """将度量列预先格式化为千分位字符串、接受率格式化为两位小数，报告循环直接输出"""
+    formatted = {c: stats[c].map('{:,.0f}'.format) for c in MEASURES if c in stats.columns}
+    if 'acceptance_rate' in stats.columns:
+        formatted['acceptance_rate'] = stats['acceptance_rate'].map('{:.2f}'.format)
+    return stats.assign(**formatted)
+
+
+def analyze_user_summary(df: pd.DataFrame):
     """分析用户总体指标"""
-    print("\n" + "=" * 70)
-    print("📊 用户总体指标分析")
-    print("=" * 70)
+    buf = io.StringIO()
+    print("\n" + "=" * 70, file=buf)
+    print("📊 用户总体指标分析", file=buf)
+    print("=" * 70, file=buf)
     
-    df = pd.read_csv(csv_file)
-    
-    print(f"\n📈 基础统计:")
-    print(f"   总用户数: {df['user_id'].nunique()}")
-    print(f"   总记录数: {len(df)}")
-    print(f"   数据日期范围: {df['day'].min()} 至 {df['day'].max()}")
-    
-    print(f"\n🎯 活动指标:")
-    print(f"   总交互次数: {df['user_initiated_interaction_count'].sum():,}")
-    print(f"   总代码生成次数: {df['code_generation_activity_count'].sum():,}")
-    print(f"   总代码接受次数: {df['code_acceptance_activity_count'].sum():,}")
-    print(f"   平均接受率: {df['acceptance_rate'].mean():.2f}%")
-    
-    print(f"\n📝 代码行数统计:")
-    print(f"   总建议新增行数: {df['loc_suggested_to_add_sum'].sum():,}")
-    print(f"   总实际新增行数: {df['loc_added_sum'].sum():,}")
-    print(f"   总实际删除行数: {df['loc_deleted_sum'].sum():,}")
-    print(f"   平均采纳率: {df['adoption_rate'].mean():.2f}%")
-    
-    print(f"\n🚀 高级功能采用:")
-    agent_users = df['used_agent'].sum()
-    chat_users = df['used_chat'].sum()
-    total_users = df['user_id'].nunique()
-    print(f"   使用 Agent 的记录数: {agent_users} ({agent_users/len(df)*100:.1f}%)")
-    print(f"   使用 Chat 的记录数: {chat_users} ({chat_users/len(df)*100:.1f}%)")
-    
-    print(f"\n🏆 TOP 10 最活跃用户 (按代码生成次数):")
-    top_users = df.groupby('user_login').agg({
+    # 一次 agg 完成全部标量汇总
+    totals = df.agg({
+        'user_initiated_interaction_count': 'sum',
         'code_generation_activity_count': 'sum',
         'code_acceptance_activity_count': 'sum',
-        'loc_added_sum': 'sum'
-    }).sort_values('code_generation_activity_count', ascending=False).head(10)
+        'acceptance_rate': 'mean',
+        'loc_suggested_to_add_sum': 'sum',
+        'loc_added_sum': 'sum',
+        'loc_deleted_sum': 'sum',
+        'adoption_rate': 'mean',
+        'used_agent': 'sum',
+        'used_chat': 'sum',
+    })
+    
+    # 按用户聚合的结果同时用于用户计数和 TOP 10，省去对 user_id 的去重扫描
+    user_stats = summarize(df, 'user_login')
+    
+    print(f"\n📈 基础统计:", file=buf)
+    print(f"   总用户数: {len(user_stats)}", file=buf)
+    print(f"   总记录数: {len(df)}", file=buf)
+    print(f"   数据日期范围: {df['day'].min()} 至 {df['day'].max()}", file=buf)
+    
+    print(f"\n🎯 活动指标:", file=buf)
+    print(f"   总交互次数: {int(totals['user_initiated_interaction_count']):,}", file=buf)
+    print(f"   总代码生成次数: {int(totals['code_generation_activity_count']):,}", file=buf)
+    print(f"   总代码接受次数: {int(totals['code_acceptance_activity_count']):,}", file=buf)
+    print(f"   平均接受率: {totals['acceptance_rate']:.2f}%", file=buf)
+    
+    print(f"\n📝 代码行数统计:", file=buf)
+    print(f"   总建议新增行数: {int(totals['loc_suggested_to_add_sum']):,}", file=buf)
+    print(f"   总实际新增行数: {int(totals['loc_added_sum']):,}", file=buf)
+    print(f"   总实际删除行数: {int(totals['loc_deleted_sum']):,}", file=buf)
+    print(f"   平均采纳率: {totals['adoption_rate']:.2f}%", file=buf)
     
-    for idx, (user, row) in enumerate(top_users.iterrows(), 1):
-        print(f"   {idx:2d}. {user:30s} - 生成: {row['code_generation_activity_count']:4.0f}, "
-              f"接受: {row['code_acceptance_activity_count']:4.0f}, "
-              f"新增行数: {row['loc_added_sum']:5.0f}")
+    print(f"\n🚀 高级功能采用:", file=buf)
+    agent_users = int(totals['used_agent'])
+    chat_users = int(totals['used_chat'])
+    print(f"   使用 Agent 的记录数: {agent_users} ({agent_users/len(df)*100:.1f}%)", file=buf)
+    print(f"   使用 Chat 的记录数: {chat_users} ({chat_users/len(df)*100:.1f}%)", file=buf)
+    
+    print(f"\n🏆 TOP 10 最活跃用户 (按代码生成次数):", file=buf)
+    top_users = user_stats.sort_values('code_generation_activity_count', ascending=False).head(10)
+    
+    for idx, row in enumerate(top_users.itertuples(), 1):
+        print(f"   {idx:2d}. {row.Index:30s} - 生成: {row.code_generation_activity_count:4.0f}, "
+              f"接受: {row.code_acceptance_activity_count:4.0f}, "
+              f"新增行数: {row.loc_added_sum:5.0f}", file=buf)
+    
+    sys.stdout.write(buf.getvalue())
 
 
-def analyze_by_feature(csv_file: str):
+def analyze_by_feature(df: pd.DataFrame):
     """分析功能维度"""
-    print("\n" + "=" * 70)
-    print("⚡ 功能维度分析")
-    print("=" * 70)
-    
-    df = pd.read_csv(csv_file)
+    buf = io.StringIO()
+    print("\n" + "=" * 70, file=buf)
+    print("⚡ 功能维度分析", file=buf)
+    print("=" * 70, file=buf)
     
     # 按功能聚合
-    feature_stats = df.groupby('feature').agg({
-        'code_generation_activity_count': 'sum',
-        'code_acceptance_activity_count': 'sum',
-        'loc_suggested_to_add_sum': 'sum',
-        'loc_added_sum': 'sum'
-    }).sort_values('code_generation_activity_count', ascending=False)
+    feature_stats = with_acceptance_rate(summarize(df, 'feature')).sort_values('code_generation_activity_count', ascending=False)
+    
+    print(f"\n📊 各功能使用统计:", file=buf)
+    for row in format_measures(feature_stats).itertuples():
+        print(f"\n   【{row.Index}】", file=buf)
+        print(f"      代码生成次数: {row.code_generation_activity_count}", file=buf)
+        print(f"      代码接受次数: {row.code_acceptance_activity_count}", file=buf)
+        print(f"      接受率: {row.acceptance_rate}%", file=buf)
+        print(f"      建议新增行数: {row.loc_suggested_to_add_sum}", file=buf)
+        print(f"      实际新增行数: {row.loc_added_sum}", file=buf)
     
-    print(f"\n📊 各功能使用统计:")
-    for feature, row in feature_stats.iterrows():
-        acceptance_rate = (row['code_acceptance_activity_count'] / row['code_generation_activity_count'] * 100) if row['code_generation_activity_count'] > 0 else 0
-        print(f"\n   【{feature}】")
-        print(f"      代码生成次数: {row['code_generation_activity_count']:,.0f}")
-        print(f"      代码接受次数: {row['code_acceptance_activity_count']:,.0f}")
-        print(f"      接受率: {acceptance_rate:.2f}%")
-        print(f"      建议新增行数: {row['loc_suggested_to_add_sum']:,.0f}")
-        print(f"      实际新增行数: {row['loc_added_sum']:,.0f}")
+    sys.stdout.write(buf.getvalue())
 
 
-def analyze_by_language(csv_file: str):
+def analyze_by_language(df: pd.DataFrame):
     """分析编程语言维度"""
-    print("\n" + "=" * 70)
-    print("🔤 编程语言维度分析")
-    print("=" * 70)
-    
-    df = pd.read_csv(csv_file)
+    buf = io.StringIO()
+    print("\n" + "=" * 70, file=buf)
+    print("🔤 编程语言维度分析", file=buf)
+    print("=" * 70, file=buf)
     
     # 按语言聚合
-    lang_stats = df.groupby('language').agg({
-        'code_generation_activity_count': 'sum',
-        'code_acceptance_activity_count': 'sum',
-        'loc_suggested_to_add_sum': 'sum',
-        'loc_added_sum': 'sum'
-    }).sort_values('code_generation_activity_count', ascending=False).head(10)
+    lang_stats = with_acceptance_rate(summarize(df, 'language')).sort_values('code_generation_activity_count', ascending=False).head(10)
+    
+    print(f"\n📊 TOP 10 使用最多的编程语言:", file=buf)
+    for idx, row in enumerate(format_measures(lang_stats).itertuples(), 1):
+        print(f"\n   {idx:2d}. 【{row.Index}】", file=buf)
+        print(f"       代码生成次数: {row.code_generation_activity_count}", file=buf)
+        print(f"       代码接受次数: {row.code_acceptance_activity_count}", file=buf)
+        print(f"       接受率: {row.acceptance_rate}%", file=buf)
+        print(f"       实际新增行数: {row.loc_added_sum}", file=buf)
     
-    print(f"\n📊 TOP 10 使用最多的编程语言:")
-    for idx, (lang, row) in enumerate(lang_stats.iterrows(), 1):
-        acceptance_rate = (row['code_acceptance_activity_count'] / row['code_generation_activity_count'] * 100) if row['code_generation_activity_count'] > 0 else 0
-        print(f"\n   {idx:2d}. 【{lang}】")
-        print(f"       代码生成次数: {row['code_generation_activity_count']:,.0f}")
-        print(f"       代码接受次数: {row['code_acceptance_activity_count']:,.0f}")
-        print(f"       接受率: {acceptance_rate:.2f}%")
-        print(f"       实际新增行数: {row['loc_added_sum']:,.0f}")
+    sys.stdout.write(buf.getvalue())
 
 
-def analyze_by_ide(csv_file: str):
+def analyze_by_ide(df: pd.DataFrame):
     """分析IDE维度"""
-    print("\n" + "=" * 70)
-    print("🛠️ IDE 维度分析")
-    print("=" * 70)
-    
-    df = pd.read_csv(csv_file)
+    buf = io.StringIO()
+    print("\n" + "=" * 70, file=buf)
+    print("🛠️ IDE 维度分析", file=buf)
+    print("=" * 70, file=buf)
     
     # 按IDE聚合
-    ide_stats = df.groupby('ide').agg({
-        'user_initiated_interaction_count': 'sum',
-        'code_generation_activity_count': 'sum',
-        'code_acceptance_activity_count': 'sum',
-        'loc_added_sum': 'sum'
-    }).sort_values('code_generation_activity_count', ascending=False)
+    ide_stats = with_acceptance_rate(summarize(df, 'ide')).sort_values('code_generation_activity_count', ascending=False)
     
-    print(f"\n📊 各 IDE 使用统计:")
-    for ide, row in ide_stats.iterrows():
-        acceptance_rate = (row['code_acceptance_activity_count'] / row['code_generation_activity_count'] * 100) if row['code_generation_activity_count'] > 0 else 0
-        print(f"\n   【{ide.upper()}】")
-        print(f"      用户交互次数: {row['user_initiated_interaction_count']:,.0f}")
-        print(f"      代码生成次数: {row['code_generation_activity_count']:,.0f}")
-        print(f"      代码接受次数: {row['code_acceptance_activity_count']:,.0f}")
-        print(f"      接受率: {acceptance_rate:.2f}%")
-        print(f"      实际新增行数: {row['loc_added_sum']:,.0f}")
+    print(f"\n📊 各 IDE 使用统计:", file=buf)
+    for row in format_measures(ide_stats).itertuples():
+        print(f"\n   【{row.Index.upper()}】", file=buf)
+        print(f"      用户交互次数: {row.user_initiated_interaction_count}", file=buf)
+        print(f"      代码生成次数: {row.code_generation_activity_count}", file=buf)
+        print(f"      代码接受次数: {row.code_acceptance_activity_count}", file=buf)
+        print(f"      接受率: {row.acceptance_rate}%", file=buf)
+        print(f"      实际新增行数: {row.loc_added_sum}", file=buf)
+    
+    sys.stdout.write(buf.getvalue())
 
 
-def analyze_by_model(csv_file: str):
+def analyze_by_model(df: pd.DataFrame):
     """分析AI模型维度"""
-    print("\n" + "=" * 70)
-    print("🤖 AI 模型维度分析")
-    print("=" * 70)
-    
-    df = pd.read_csv(csv_file)
+    buf = io.StringIO()
+    print("\n" + "=" * 70, file=buf)
+    print("🤖 AI 模型维度分析", file=buf)
+    print("=" * 70, file=buf)
     
     # 按模型聚合
-    model_stats = df.groupby('model').agg({
-        'user_initiated_interaction_count': 'sum',
-        'code_generation_activity_count': 'sum',
-        'code_acceptance_activity_count': 'sum',
-        'loc_suggested_to_add_sum': 'sum',
-        'loc_added_sum': 'sum'
-    }).sort_values('code_generation_activity_count', ascending=False)
+    model_stats = with_acceptance_rate(summarize(df, 'model')).sort_values('code_generation_activity_count', ascending=False)
+    
+    print(f"\n📊 各 AI 模型使用统计:", file=buf)
+    for row in format_measures(model_stats).itertuples():
+        print(f"\n   【{row.Index}】", file=buf)
+        print(f"      用户交互次数: {row.user_initiated_interaction_count}", file=buf)
+        print(f"      代码生成次数: {row.code_generation_activity_count}", file=buf)
+        print(f"      代码接受次数: {row.code_acceptance_activity_count}", file=buf)
+        print(f"      接受率: {row.acceptance_rate}%", file=buf)
+        print(f"      建议新增行数: {row.loc_suggested_to_add_sum}", file=buf)
+        print(f"      实际新增行数: {row.loc_added_sum}", file=buf)
     
-    print(f"\n📊 各 AI 模型使用统计:")
-    for model, row in model_stats.iterrows():
-        acceptance_rate = (row['code_acceptance_activity_count'] / row['code_generation_activity_count'] * 100) if row['code_generation_activity_count'] > 0 else 0
-        print(f"\n   【{model}】")
-        print(f"      用户交互次数: {row['user_initiated_interaction_count']:,.0f}")
-        print(f"      代码生成次数: {row['code_generation_activity_count']:,.0f}")
-        print(f"      代码接受次数: {row['code_acceptance_activity_count']:,.0f}")
-        print(f"      接受率: {acceptance_rate:.2f}%")
-        print(f"      建议新增行数: {row['loc_suggested_to_add_sum']:,.0f}")
-        print(f"      实际新增行数: {row['loc_added_sum']:,.0f}")
+    sys.stdout.write(buf.getvalue())
 
 
 def main():
@@ -168,39 +396,52 @@ def main():
     print("\n🎯 GitHub Copilot User Level Metrics - 数据分析报告")
     print("=" * 70)
     
-    # 查找所有 CSV 文件
-    csv_files = glob.glob("*_*.csv")
+    # 按文件后缀匹配分析函数：(后缀, 分析函数, 所需列)
+    analyses = [
+        ('_user_summary.csv', analyze_user_summary, USER_SUMMARY_COLUMNS),    # 用户总体指标
+        ('_by_feature.csv', analyze_by_feature, FEATURE_COLUMNS),             # 功能维度
+        ('_by_language_feature.csv', analyze_by_language, LANGUAGE_COLUMNS),  # 编程语言维度
+        ('_by_ide.csv', analyze_by_ide, IDE_COLUMNS),                         # IDE 维度
+        ('_by_model_feature.csv', analyze_by_model, MODEL_COLUMNS),           # AI 模型维度
+    ]
+    
+    # 单次扫描当前目录查找 CSV 文件，并按后缀归类（每个后缀取第一个匹配文件）
+    csv_count = 0
+    matched = {}
+    with os.scandir('.') as entries:
+        for entry in entries:
+            name = entry.name
+            if not name.endswith('.csv') or '_' not in name or name.startswith('.'):
+                continue
+            csv_count += 1
+            for suffix, _, _ in analyses:
+                if name.endswith(suffix):
+                    matched.setdefault(suffix, name)
+                    break
     
-    if not csv_files:
+    if not csv_count:
         print("❌ 未找到 CSV 文件，请先运行 json_to_csv.py 生成 CSV 文件")
         return
     
-    print(f"\n找到 {len(csv_files)} 个 CSV 文件")
-    
-    # 分析用户总体指标
-    user_summary_files = [f for f in csv_files if '_user_summary.csv' in f]
-    if user_summary_files:
-        analyze_user_summary(user_summary_files[0])
-    
-    # 分析功能维度
-    feature_files = [f for f in csv_files if '_by_feature.csv' in f]
-    if feature_files:
-        analyze_by_feature(feature_files[0])
+    print(f"\n找到 {csv_count} 个 CSV 文件")
     
-    # 分析编程语言维度
-    lang_feature_files = [f for f in csv_files if '_by_language_feature.csv' in f]
-    if lang_feature_files:
-        analyze_by_language(lang_feature_files[0])
+    tasks = [
+        (analyzer, matched[suffix], columns)
+        for suffix, analyzer, columns in analyses
+        if suffix in matched
+    ]
     
-    # 分析IDE维度
-    ide_files = [f for f in csv_files if '_by_ide.csv' in f]
-    if ide_files:
-        analyze_by_ide(ide_files[0])
+    # 并发读取各 CSV（C/Arrow 解析器会释放 GIL），再按顺序执行分析并输出报告；
+    # 聚合留在主线程
+    def prepare(task):
+        _, csv_file, columns = task
+        return load_csv(csv_file, columns)
     
-    # 分析AI模型维度
-    model_feature_files = [f for f in csv_files if '_by_model_feature.csv' in f]
-    if model_feature_files:
-        analyze_by_model(model_feature_files[0])
+    if tasks:
+        with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+            frames = list(executor.map(prepare, tasks))
+        for (analyzer, _, _), df in zip(tasks, frames):
+            analyzer(df)
     
     print("\n" + "=" * 70)
     print("✅ 分析完成！")
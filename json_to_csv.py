@@ -10,15 +10,100 @@ Enhancements in this version:
 
 import argparse
 import csv
+import heapq
+import importlib.util
 import json
+import mmap
+import os
+import re
+import stat
+import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+from itertools import chain, count
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Tuple
+from types import MappingProxyType
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    # 可选: 安装 orjson 后使用其 C 实现解析/序列化 JSON
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj: Any) -> bytes:
+        """Serialise ``obj`` to compact UTF-8 JSON bytes, matching ``orjson.dumps``."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# 用户未使用某功能时 _extract_feature_metrics 返回的只读零值指标
+EMPTY_FEATURE_METRICS: Mapping[str, int] = MappingProxyType({
+    "user_initiated_interaction_count": 0,
+    "code_generation_activity_count": 0,
+    "code_acceptance_activity_count": 0,
+    "loc_suggested_to_add_sum": 0,
+    "loc_suggested_to_delete_sum": 0,
+    "loc_added_sum": 0,
+    "loc_deleted_sum": 0,
+})
+
+
+class ParquetRowWriter:
+    """Collect row tuples like ``csv.writer`` and write them as one Parquet table on close.
+
+    pyarrow is imported here rather than at module level so CSV exports keep
+    depending on the standard library only.
+    """
+
+    def __init__(self, output_file: Path, headers: Sequence[str]):
+        import pyarrow
+        import pyarrow.parquet
+
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.output_file = output_file
+        self.headers = tuple(headers)
+        self.rows: List[Tuple[Any, ...]] = []
+        self.writerows = self.rows.extend
+
+    def __enter__(self) -> "ParquetRowWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+
+    def close(self) -> None:
+        columns = list(zip(*self.rows)) or [()] * len(self.headers)
+        table = self._pa.table([self._to_array(column) for column in columns], names=list(self.headers))
+        self._pq.write_table(table, str(self.output_file), compression="zstd")
+
+    def _to_array(self, column: Sequence[Any]) -> Any:
+        try:
+            return self._pa.array(column)
+        except (self._pa.ArrowInvalid, self._pa.ArrowTypeError):
+            # 缺失字段以 "" 填充时同一列会混有数字和字符串，此时按 CSV 中的文本写出
+            return self._pa.array([str(value) for value in column])
+
+
+class NdjsonRowWriter:
+    """Write row tuples to a binary handle as one JSON object per line, keyed by header."""
+
+    def __init__(self, handle: Any, headers: Sequence[str]):
+        self._write = handle.write
+        self.headers = tuple(headers)
+
+    def writerows(self, rows: Iterable[Tuple[Any, ...]]) -> None:
+        headers = self.headers
+        self._write(b"".join(json_dumps(dict(zip(headers, row))) + b"\n" for row in rows))
 
 
 class CopilotMetricsConverter:
     """Convert GitHub Copilot user-level metrics from JSON to CSV."""
 
-    BASE_SUM_FIELDS = [
+    BASE_SUM_FIELDS = (
         "user_initiated_interaction_count",
         "code_generation_activity_count",
         "code_acceptance_activity_count",
@@ -26,44 +111,84 @@ class CopilotMetricsConverter:
         "loc_suggested_to_delete_sum",
         "loc_added_sum",
         "loc_deleted_sum",
-    ]
+    )
+    # 语言相关维度没有 user_initiated_interaction_count
+    LOC_SUM_FIELDS = (
+        "code_generation_activity_count",
+        "code_acceptance_activity_count",
+        "loc_suggested_to_add_sum",
+        "loc_suggested_to_delete_sum",
+        "loc_added_sum",
+        "loc_deleted_sum",
+    )
+    # 导出格式 → 文件扩展名（parquet 需要安装 pyarrow）
+    OUTPUT_FORMATS = {"csv": ".csv", "parquet": ".parquet", "ndjson": ".ndjson"}
+    # 各维度明细数组：(字段名, 分组键字段, 求和字段, 保留最新采样值的字段)
+    DIMENSIONS = (
+        ("totals_by_ide", ("ide",), BASE_SUM_FIELDS, ("last_known_plugin_version", "last_known_ide_version")),
+        ("totals_by_feature", ("feature",), BASE_SUM_FIELDS, ()),
+        ("totals_by_language_feature", ("language", "feature"), LOC_SUM_FIELDS, ()),
+        ("totals_by_language_model", ("language", "model"), LOC_SUM_FIELDS, ()),
+        ("totals_by_model_feature", ("model", "feature"), BASE_SUM_FIELDS, ()),
+    )
 
-    def __init__(self, json_file: str):
+    def __init__(self, json_file: str, csv_encoding: str = "utf-8-sig", quiet: bool = False):
         self.json_file = Path(json_file)
-        self.raw_data = self._load_raw_json()
-        self.data = self._aggregate_records(self.raw_data)
-        print(
-            f"✅ 数据聚合完成: {len(self.raw_data)} 条原始记录 → "
+        self.base_name = self.json_file.stem
+        # 默认带 BOM 以便 Excel 正确识别中文表头；下游用 Arrow/DuckDB 等读取时可改为 "utf-8"
+        self.csv_encoding = csv_encoding
+        self.quiet = quiet
+        self._date_range: Optional[str] = None
+        # 原始记录只在聚合时使用，不保留在实例上，导出和生成报告期间即可释放
+        records = self._load_raw_json()
+        self.raw_count = len(records)
+        self.data = self._aggregate_records(records)
+        del records
+        self._emit(
+            f"✅ 数据聚合完成: {self.raw_count} 条原始记录 → "
             f"{len(self.data)} 条用户日汇总记录"
         )
 
+    def _emit(self, *lines: str) -> None:
+        """Write status ``lines`` to stdout in one call, unless running quietly."""
+        if not self.quiet:
+            sys.stdout.write("\n".join(lines) + "\n")
+
     # ------------------------------------------------------------------
     # Load and aggregate JSON
     # ------------------------------------------------------------------
     def _load_raw_json(self) -> List[Dict[str, Any]]:
         """Read JSON content (supports JSON-lines and JSON-array formats)."""
-        print(f"📖 正在读取 JSON 文件: {self.json_file}")
-        content = self.json_file.read_text(encoding="utf-8").strip()
-        if not content:
-            return []
-
-        records: List[Dict[str, Any]] = []
-        for line in content.splitlines():
-            if not line.strip():
-                continue
-            try:
-                records.append(json.loads(line))
-            except json.JSONDecodeError:
-                records = json.loads(content)
-                break
-
-        print(f"✅ 成功读取 {len(records)} 条原始记录")
+        self._emit(f"📖 正在读取 JSON 文件: {self.json_file}")
+        with ExitStack() as stack:
+            handle = stack.enter_context(self.json_file.open("rb"))
+            st = os.fstat(handle.fileno())
+            if stat.S_ISREG(st.st_mode) and st.st_size:
+                # 普通文件通过 mmap 读取，JSON-lines 逐行解析时无需先把整个文件复制到内存
+                content: Any = stack.enter_context(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+                lines: Iterable[bytes] = iter(content.readline, b"")
+            else:
+                # 管道、FIFO、/dev/stdin 等不可 mmap，且 st_size 恒为 0，直接读取全部内容
+                content = handle.read()
+                lines = content.split(b"\n")
+
+            first = re.search(rb"\S", content)
+            if first is None:
+                return []
+
+            # 首个非空白字符为 "[" 即 JSON 数组，否则按 JSON-lines 逐行解析
+            if content[first.start()] == ord("["):
+                records: List[Dict[str, Any]] = json_loads(content[:])
+            else:
+                records = [json_loads(line) for line in lines if line.strip()]
+
+        self._emit(f"✅ 成功读取 {len(records)} 条原始记录")
         return records
 
     def _aggregate_records(self, records: Iterable[Dict[str, Any]]):
         """Aggregate records by user name, summing their fields across all days."""
-        aggregates: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
-
+        # 先按用户分组（单次遍历），再对每组逐列归约，每个用户只调用一次各维度聚合
+        groups: Dict[Tuple[Any, ...], List[Dict[str, Any]]] = {}
         for record in records:
             # 按用户名称汇总（不再按日期分组）
             key = (
@@ -71,38 +196,40 @@ class CopilotMetricsConverter:
                 record.get("enterprise_id"),
                 record.get("user_id"),
             )
-            if key not in aggregates:
-                aggregates[key] = self._initialise_aggregate(record)
-
-            aggregate = aggregates[key]
-            self._aggregate_base_fields(aggregate, record)
-            self._aggregate_totals_by_ide(aggregate["totals_by_ide"], record.get("totals_by_ide", []))
-            self._aggregate_totals_by_feature(aggregate["totals_by_feature"], record.get("totals_by_feature", []))
-            self._aggregate_language_feature(
-                aggregate["totals_by_language_feature"], record.get("totals_by_language_feature", [])
-            )
-            self._aggregate_language_model(
-                aggregate["totals_by_language_model"], record.get("totals_by_language_model", [])
-            )
-            self._aggregate_model_feature(
-                aggregate["totals_by_model_feature"], record.get("totals_by_model_feature", [])
-            )
-            
-            # 更新日期范围
+            try:
+                groups[key].append(record)
+            except KeyError:
+                groups[key] = [record]
+
+        aggregated_list = []
+        for group in groups.values():
+            aggregate = self._initialise_aggregate(group[0])
+            self._aggregate_base_fields(aggregate, group)
+            for field, key_fields, sum_fields, latest_fields in self.DIMENSIONS:
+                self._aggregate_dimension(
+                    aggregate[field], self._chain_items(group, field), key_fields, sum_fields, latest_fields
+                )
+
+            # 更新日期范围（ISO 日期字符串可直接比较；忽略缺失的日期，避免空串被当作最小值）
             aggregate["report_start_day"] = min(
-                aggregate["report_start_day"] or record.get("report_start_day", ""),
-                record.get("report_start_day", "")
-            ) if aggregate["report_start_day"] else record.get("report_start_day", "")
-            
+                (r["report_start_day"] for r in group if r.get("report_start_day")),
+                default=aggregate["report_start_day"],
+            )
             aggregate["report_end_day"] = max(
-                aggregate["report_end_day"] or record.get("report_end_day", ""),
-                record.get("report_end_day", "")
-            ) if aggregate["report_end_day"] else record.get("report_end_day", "")
+                (r["report_end_day"] for r in group if r.get("report_end_day")),
+                default=aggregate["report_end_day"],
+            )
+
+            aggregated_list.append(self._finalise_aggregate(aggregate))
 
-        aggregated_list = [self._finalise_aggregate(entry) for entry in aggregates.values()]
         aggregated_list.sort(key=lambda item: item["user_login"])
         return aggregated_list
 
+    @staticmethod
+    def _chain_items(group: List[Dict[str, Any]], field: str) -> Iterable[Dict[str, Any]]:
+        """Concatenate one nested totals array across all records of a group."""
+        return chain.from_iterable(record.get(field, []) for record in group)
+
     def _initialise_aggregate(self, record: Dict[str, Any]) -> Dict[str, Any]:
         aggregate = {
             "report_start_day": record.get("report_start_day"),
@@ -111,610 +238,485 @@ class CopilotMetricsConverter:
             "enterprise_id": record.get("enterprise_id"),
             "user_id": record.get("user_id"),
             "user_login": record.get("user_login"),
-            "used_agent": bool(record.get("used_agent", False)),
-            "used_chat": bool(record.get("used_chat", False)),
+            # 由 _aggregate_base_fields 对整组记录取逻辑或
+            "used_agent": False,
+            "used_chat": False,
             "totals_by_ide": {},
             "totals_by_feature": {},
             "totals_by_language_feature": {},
             "totals_by_language_model": {},
             "totals_by_model_feature": {},
         }
-        for field in self.BASE_SUM_FIELDS:
-            aggregate[field] = 0
+        aggregate.update(dict.fromkeys(self.BASE_SUM_FIELDS, 0))
         return aggregate
 
-    def _aggregate_base_fields(self, aggregate: Dict[str, Any], record: Dict[str, Any]) -> None:
+    def _aggregate_base_fields(self, aggregate: Dict[str, Any], group: List[Dict[str, Any]]) -> None:
         for field in self.BASE_SUM_FIELDS:
-            aggregate[field] += record.get(field, 0)
-        aggregate["used_agent"] = aggregate["used_agent"] or record.get("used_agent", False)
-        aggregate["used_chat"] = aggregate["used_chat"] or record.get("used_chat", False)
-
-    def _aggregate_totals_by_ide(self, container: Dict[str, Dict[str, Any]], items: Iterable[Dict[str, Any]]) -> None:
-        sum_fields = [
-            "user_initiated_interaction_count",
-            "code_generation_activity_count",
-            "code_acceptance_activity_count",
-            "loc_suggested_to_add_sum",
-            "loc_suggested_to_delete_sum",
-            "loc_added_sum",
-            "loc_deleted_sum",
-        ]
-        for item in items:
-            ide = item.get("ide", "unknown")
-            entry = container.get(ide)
-            if entry is None:
-                entry = {"ide": ide}
-                for field in sum_fields:
-                    entry[field] = 0
-                entry["last_known_plugin_version"] = None
-                entry["last_known_ide_version"] = None
-                container[ide] = entry
-            for field in sum_fields:
-                entry[field] += item.get(field, 0)
-            entry["last_known_plugin_version"] = self._choose_latest(
-                entry.get("last_known_plugin_version"), item.get("last_known_plugin_version")
-            )
-            entry["last_known_ide_version"] = self._choose_latest(
-                entry.get("last_known_ide_version"), item.get("last_known_ide_version")
-            )
+            aggregate[field] = sum(record.get(field, 0) for record in group)
+        aggregate["used_agent"] = any(record.get("used_agent", False) for record in group)
+        aggregate["used_chat"] = any(record.get("used_chat", False) for record in group)
 
-    def _aggregate_totals_by_feature(self, container: Dict[str, Dict[str, Any]], items: Iterable[Dict[str, Any]]) -> None:
-        sum_fields = [
-            "user_initiated_interaction_count",
-            "code_generation_activity_count",
-            "code_acceptance_activity_count",
-            "loc_suggested_to_add_sum",
-            "loc_suggested_to_delete_sum",
-            "loc_added_sum",
-            "loc_deleted_sum",
-        ]
-        for item in items:
-            feature = item.get("feature", "unknown")
-            entry = container.get(feature)
-            if entry is None:
-                entry = {"feature": feature}
-                for field in sum_fields:
-                    entry[field] = 0
-                container[feature] = entry
-            for field in sum_fields:
-                entry[field] += item.get(field, 0)
-
-    def _aggregate_language_feature(
+    def _aggregate_dimension(
         self,
-        container: Dict[Tuple[str, str], Dict[str, Any]],
+        container: Dict[Any, List[Any]],
         items: Iterable[Dict[str, Any]],
+        key_fields: Tuple[str, ...],
+        sum_fields: Tuple[str, ...],
+        latest_fields: Tuple[str, ...] = (),
     ) -> None:
-        sum_fields = [
-            "code_generation_activity_count",
-            "code_acceptance_activity_count",
-            "loc_suggested_to_add_sum",
-            "loc_suggested_to_delete_sum",
-            "loc_added_sum",
-            "loc_deleted_sum",
-        ]
-        for item in items:
-            key = (item.get("language", "unknown"), item.get("feature", "unknown"))
-            entry = container.get(key)
-            if entry is None:
-                entry = {"language": key[0], "feature": key[1]}
-                for field in sum_fields:
-                    entry[field] = 0
-                container[key] = entry
-            for field in sum_fields:
-                entry[field] += item.get(field, 0)
-
-    def _aggregate_language_model(
-        self,
-        container: Dict[Tuple[str, str], Dict[str, Any]],
-        items: Iterable[Dict[str, Any]],
-    ) -> None:
-        sum_fields = [
-            "code_generation_activity_count",
-            "code_acceptance_activity_count",
-            "loc_suggested_to_add_sum",
-            "loc_suggested_to_delete_sum",
-            "loc_added_sum",
-            "loc_deleted_sum",
-        ]
-        for item in items:
-            key = (item.get("language", "unknown"), item.get("model", "unknown"))
-            entry = container.get(key)
-            if entry is None:
-                entry = {"language": key[0], "model": key[1]}
-                for field in sum_fields:
-                    entry[field] = 0
-                container[key] = entry
-            for field in sum_fields:
-                entry[field] += item.get(field, 0)
-
-    def _aggregate_model_feature(
-        self,
-        container: Dict[Tuple[str, str], Dict[str, Any]],
-        items: Iterable[Dict[str, Any]],
-    ) -> None:
-        sum_fields = [
-            "user_initiated_interaction_count",
-            "code_generation_activity_count",
-            "code_acceptance_activity_count",
-            "loc_suggested_to_add_sum",
-            "loc_suggested_to_delete_sum",
-            "loc_added_sum",
-            "loc_deleted_sum",
-        ]
+        """Accumulate one nested totals array into ``container`` keyed by ``key_fields``.
+
+        Values are kept in a fixed-layout list (``sum_fields``, ``latest_fields``, then the
+        ``sampled_at`` of each latest value) and only turned into dicts by ``_finalise_aggregate``.
+        """
+        # itemgetter 在 C 层直接取出键（单字段时为字符串，多字段时为元组）；
+        # 缺少键字段的明细较少见，回退为逐字段 get 并记为 unknown
+        get_key = itemgetter(*key_fields)
+        defaults = ("unknown",) * len(key_fields)
+        sum_slots = tuple(enumerate(sum_fields))
+        latest_slots = tuple(
+            (index, index + len(latest_fields), field) for index, field in enumerate(latest_fields, len(sum_fields))
+        )
         for item in items:
-            key = (item.get("model", "unknown"), item.get("feature", "unknown"))
-            entry = container.get(key)
-            if entry is None:
-                entry = {"model": key[0], "feature": key[1]}
-                for field in sum_fields:
-                    entry[field] = 0
-                container[key] = entry
-            for field in sum_fields:
-                entry[field] += item.get(field, 0)
+            try:
+                key = get_key(item)
+            except KeyError:
+                key = tuple(map(item.get, key_fields, defaults))
+                if len(key) == 1:
+                    key = key[0]
+            # 命中（常见情况）只需一次字典查找
+            try:
+                values = container[key]
+            except KeyError:
+                values = container[key] = [0] * len(sum_fields) + [None] * (2 * len(latest_fields))
+            for index, field in sum_slots:
+                values[index] += item.get(field, 0)
+            # 保留 sampled_at 最新的非空值（ISO 8601 字符串可直接比较，相同时取后出现的）；
+            # 当前值的 sampled_at 缓存在列表中，每条明细只需读取一次候选值的时间
+            for index, sampled_index, field in latest_slots:
+                candidate = item.get(field)
+                if candidate:
+                    sampled_at = candidate.get("sampled_at", "")
+                    if values[index] is None or sampled_at >= values[sampled_index]:
+                        values[index] = candidate
+                        values[sampled_index] = sampled_at
 
     def _finalise_aggregate(self, aggregate: Dict[str, Any]) -> Dict[str, Any]:
-        aggregate["totals_by_ide"] = sorted(aggregate["totals_by_ide"].values(), key=lambda item: item["ide"])
-        aggregate["totals_by_feature"] = sorted(
-            aggregate["totals_by_feature"].values(), key=lambda item: item["feature"]
-        )
-        aggregate["totals_by_language_feature"] = sorted(
-            aggregate["totals_by_language_feature"].values(),
-            key=lambda item: (item["language"], item["feature"]),
-        )
-        aggregate["totals_by_language_model"] = sorted(
-            aggregate["totals_by_language_model"].values(),
-            key=lambda item: (item["language"], item["model"]),
-        )
-        aggregate["totals_by_model_feature"] = sorted(
-            aggregate["totals_by_model_feature"].values(),
-            key=lambda item: (item["model"], item["feature"]),
-        )
+        for field, key_fields, sum_fields, latest_fields in self.DIMENSIONS:
+            value_fields = sum_fields + latest_fields
+            entries = []
+            for key, values in sorted(aggregate[field].items()):
+                entry = dict(zip(key_fields, key if len(key_fields) > 1 else (key,)))
+                entry.update(zip(value_fields, values))
+                entries.append(entry)
+            aggregate[field] = entries
+        aggregate["_feature_index"] = {item["feature"]: item for item in aggregate["totals_by_feature"]}
         return aggregate
 
-    @staticmethod
-    def _choose_latest(existing: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, Any]:
-        if not candidate:
-            return existing
-        if not existing:
-            return candidate
-        if candidate.get("sampled_at", "") >= existing.get("sampled_at", ""):
-            return candidate
-        return existing
-
     # ------------------------------------------------------------------
     # CSV exports
     # ------------------------------------------------------------------
-    def export_user_summary(self, output_file: Path) -> Path:
-        print("\n📊 导出用户总体指标（按用户汇总）...")
-        headers = [
-            "用户名",
-            "报告开始日期",
-            "报告结束日期",
-            "Code Completion 代码生成次数",
-            "Code Completion 代码接受次数",
-            "Code Completion 建议代码行数",
-            "Code Completion 接受代码行数",
-            "Chat Ask 交互次数",
-            "Chat Ask 接受次数",
-            "Chat Ask 建议代码行数",
-            "Chat Ask 接受代码行数",
-            "Chat Agent 建议代码行数",
-            "Chat Agent 接受代码行数",
-            "Agent Edit 添加代码行数",
-            "Agent Edit 删除代码行数",
-        ]
-
-        rows: List[Dict[str, Any]] = []
-        for record in self.data:
-            cc_metrics = self._extract_feature_metrics(record, "code_completion")
-            cc_code_gen = cc_metrics.get("code_generation_activity_count", 0)
-            cc_code_accept = cc_metrics.get("code_acceptance_activity_count", 0)
-            cc_loc_suggested = cc_metrics.get("loc_suggested_to_add_sum", 0)
-            cc_loc_added = cc_metrics.get("loc_added_sum", 0)
-
-            # 提取 chat_panel_ask_mode 相关指标
-            ask_metrics = self._extract_feature_metrics(record, "chat_panel_ask_mode")
-            ask_interaction = ask_metrics.get("user_initiated_interaction_count", 0)
-            ask_acceptance = ask_metrics.get("code_acceptance_activity_count", 0)
-            ask_loc_suggested = ask_metrics.get("loc_suggested_to_add_sum", 0)
-            ask_loc_added = ask_metrics.get("loc_added_sum", 0)
-
-            # 提取 chat_panel_agent_mode 相关指标
-            agent_mode_metrics = self._extract_feature_metrics(record, "chat_panel_agent_mode")
-            agent_mode_loc_suggested = agent_mode_metrics.get("loc_suggested_to_add_sum", 0)
-            agent_mode_loc_added = agent_mode_metrics.get("loc_added_sum", 0)
-
-            # 提取 agent_edit 相关指标
-            agent_edit_metrics = self._extract_feature_metrics(record, "agent_edit")
-            agent_edit_loc_added = agent_edit_metrics.get("loc_added_sum", 0)
-            agent_edit_loc_deleted = agent_edit_metrics.get("loc_deleted_sum", 0)
-
-            rows.append(
-                {
-                    "用户名": record.get("user_login", ""),
-                    "报告开始日期": record.get("report_start_day", ""),
-                    "报告结束日期": record.get("report_end_day", ""),
-                    "Code Completion 代码生成次数": cc_code_gen,
-                    "Code Completion 代码接受次数": cc_code_accept,
-                    "Code Completion 建议代码行数": cc_loc_suggested,
-                    "Code Completion 接受代码行数": cc_loc_added,
-                    "Chat Ask 交互次数": ask_interaction,
-                    "Chat Ask 接受次数": ask_acceptance,
-                    "Chat Ask 建议代码行数": ask_loc_suggested,
-                    "Chat Ask 接受代码行数": ask_loc_added,
-                    "Chat Agent 建议代码行数": agent_mode_loc_suggested,
-                    "Chat Agent 接受代码行数": agent_mode_loc_added,
-                    "Agent Edit 添加代码行数": agent_edit_loc_added,
-                    "Agent Edit 删除代码行数": agent_edit_loc_deleted,
-                }
-            )
+    USER_SUMMARY_HEADERS = (
+        "用户名",
+        "报告开始日期",
+        "报告结束日期",
+        "Code Completion 代码生成次数",
+        "Code Completion 代码接受次数",
+        "Code Completion 建议代码行数",
+        "Code Completion 接受代码行数",
+        "Chat Ask 交互次数",
+        "Chat Ask 接受次数",
+        "Chat Ask 建议代码行数",
+        "Chat Ask 接受代码行数",
+        "Chat Agent 建议代码行数",
+        "Chat Agent 接受代码行数",
+        "Agent Edit 添加代码行数",
+        "Agent Edit 删除代码行数",
+    )
 
-        self._write_csv(output_file, headers, rows)
-        return output_file
+    BY_IDE_HEADERS = (
+        "report_start_day",
+        "report_end_day",
+        "day",
+        "enterprise_id",
+        "user_id",
+        "user_login",
+        "ide",
+        "user_initiated_interaction_count",
+        "code_generation_activity_count",
+        "code_acceptance_activity_count",
+        "loc_suggested_to_add_sum",
+        "loc_suggested_to_delete_sum",
+        "loc_added_sum",
+        "loc_deleted_sum",
+        "plugin",
+        "plugin_version",
+        "plugin_sampled_at",
+        "ide_version",
+        "ide_version_sampled_at",
+    )
 
-    def export_by_ide(self, output_file: Path) -> Path:
-        print("\n📊 导出 IDE 维度统计...")
-        headers = [
-            "report_start_day",
-            "report_end_day",
-            "day",
-            "enterprise_id",
-            "user_id",
-            "user_login",
-            "ide",
-            "user_initiated_interaction_count",
-            "code_generation_activity_count",
-            "code_acceptance_activity_count",
-            "loc_suggested_to_add_sum",
-            "loc_suggested_to_delete_sum",
-            "loc_added_sum",
-            "loc_deleted_sum",
-            "plugin",
-            "plugin_version",
-            "plugin_sampled_at",
-            "ide_version",
-            "ide_version_sampled_at",
-        ]
-
-        rows: List[Dict[str, Any]] = []
-        for record in self.data:
-            for ide_data in record.get("totals_by_ide", []):
-                plugin_info = ide_data.get("last_known_plugin_version") or {}
-                ide_version_info = ide_data.get("last_known_ide_version") or {}
-                rows.append(
-                    {
-                        "report_start_day": record.get("report_start_day", ""),
-                        "report_end_day": record.get("report_end_day", ""),
-                        "day": record.get("day", ""),
-                        "enterprise_id": record.get("enterprise_id", ""),
-                        "user_id": record.get("user_id", ""),
-                        "user_login": record.get("user_login", ""),
-                        "ide": ide_data.get("ide", ""),
-                        "user_initiated_interaction_count": ide_data.get("user_initiated_interaction_count", 0),
-                        "code_generation_activity_count": ide_data.get("code_generation_activity_count", 0),
-                        "code_acceptance_activity_count": ide_data.get("code_acceptance_activity_count", 0),
-                        "loc_suggested_to_add_sum": ide_data.get("loc_suggested_to_add_sum", 0),
-                        "loc_suggested_to_delete_sum": ide_data.get("loc_suggested_to_delete_sum", 0),
-                        "loc_added_sum": ide_data.get("loc_added_sum", 0),
-                        "loc_deleted_sum": ide_data.get("loc_deleted_sum", 0),
-                        "plugin": plugin_info.get("plugin", ""),
-                        "plugin_version": plugin_info.get("plugin_version", ""),
-                        "plugin_sampled_at": plugin_info.get("sampled_at", ""),
-                        "ide_version": ide_version_info.get("ide_version", ""),
-                        "ide_version_sampled_at": ide_version_info.get("sampled_at", ""),
-                    }
-                )
+    BY_FEATURE_HEADERS = (
+        "report_start_day",
+        "report_end_day",
+        "day",
+        "enterprise_id",
+        "user_id",
+        "user_login",
+        "feature",
+        "user_initiated_interaction_count",
+        "code_generation_activity_count",
+        "code_acceptance_activity_count",
+        "loc_suggested_to_add_sum",
+        "loc_suggested_to_delete_sum",
+        "loc_added_sum",
+        "loc_deleted_sum",
+    )
 
-        self._write_csv(output_file, headers, rows)
-        return output_file
+    BY_LANGUAGE_FEATURE_HEADERS = (
+        "report_start_day",
+        "report_end_day",
+        "day",
+        "enterprise_id",
+        "user_id",
+        "user_login",
+        "language",
+        "feature",
+        "code_generation_activity_count",
+        "code_acceptance_activity_count",
+        "loc_suggested_to_add_sum",
+        "loc_suggested_to_delete_sum",
+        "loc_added_sum",
+        "loc_deleted_sum",
+    )
 
-    def export_by_feature(self, output_file: Path) -> Path:
-        print("\n📊 导出功能维度统计...")
-        headers = [
-            "report_start_day",
-            "report_end_day",
-            "day",
-            "enterprise_id",
-            "user_id",
-            "user_login",
-            "feature",
-            "user_initiated_interaction_count",
-            "code_generation_activity_count",
-            "code_acceptance_activity_count",
-            "loc_suggested_to_add_sum",
-            "loc_suggested_to_delete_sum",
-            "loc_added_sum",
-            "loc_deleted_sum",
-        ]
-
-        rows: List[Dict[str, Any]] = []
-        for record in self.data:
-            for feature_data in record.get("totals_by_feature", []):
-                rows.append(
-                    {
-                        "report_start_day": record.get("report_start_day", ""),
-                        "report_end_day": record.get("report_end_day", ""),
-                        "day": record.get("day", ""),
-                        "enterprise_id": record.get("enterprise_id", ""),
-                        "user_id": record.get("user_id", ""),
-                        "user_login": record.get("user_login", ""),
-                        "feature": feature_data.get("feature", ""),
-                        "user_initiated_interaction_count": feature_data.get("user_initiated_interaction_count", 0),
-                        "code_generation_activity_count": feature_data.get("code_generation_activity_count", 0),
-                        "code_acceptance_activity_count": feature_data.get("code_acceptance_activity_count", 0),
-                        "loc_suggested_to_add_sum": feature_data.get("loc_suggested_to_add_sum", 0),
-                        "loc_suggested_to_delete_sum": feature_data.get("loc_suggested_to_delete_sum", 0),
-                        "loc_added_sum": feature_data.get("loc_added_sum", 0),
-                        "loc_deleted_sum": feature_data.get("loc_deleted_sum", 0),
-                    }
-                )
+    BY_LANGUAGE_MODEL_HEADERS = (
+        "report_start_day",
+        "report_end_day",
+        "day",
+        "enterprise_id",
+        "user_id",
+        "user_login",
+        "language",
+        "model",
+        "code_generation_activity_count",
+        "code_acceptance_activity_count",
+        "loc_suggested_to_add_sum",
+        "loc_suggested_to_delete_sum",
+        "loc_added_sum",
+        "loc_deleted_sum",
+    )
 
-        self._write_csv(output_file, headers, rows)
-        return output_file
+    BY_MODEL_FEATURE_HEADERS = (
+        "report_start_day",
+        "report_end_day",
+        "day",
+        "enterprise_id",
+        "user_id",
+        "user_login",
+        "model",
+        "feature",
+        "user_initiated_interaction_count",
+        "code_generation_activity_count",
+        "code_acceptance_activity_count",
+        "loc_suggested_to_add_sum",
+        "loc_suggested_to_delete_sum",
+        "loc_added_sum",
+        "loc_deleted_sum",
+    )
 
-    def export_by_language_feature(self, output_file: Path) -> Path:
-        print("\n📊 导出编程语言 + 功能维度统计...")
-        headers = [
-            "report_start_day",
-            "report_end_day",
-            "day",
-            "enterprise_id",
-            "user_id",
-            "user_login",
-            "language",
-            "feature",
-            "code_generation_activity_count",
-            "code_acceptance_activity_count",
-            "loc_suggested_to_add_sum",
-            "loc_suggested_to_delete_sum",
-            "loc_added_sum",
-            "loc_deleted_sum",
-        ]
-
-        rows: List[Dict[str, Any]] = []
-        for record in self.data:
-            for lf_data in record.get("totals_by_language_feature", []):
-                rows.append(
-                    {
-                        "report_start_day": record.get("report_start_day", ""),
-                        "report_end_day": record.get("report_end_day", ""),
-                        "day": record.get("day", ""),
-                        "enterprise_id": record.get("enterprise_id", ""),
-                        "user_id": record.get("user_id", ""),
-                        "user_login": record.get("user_login", ""),
-                        "language": lf_data.get("language", ""),
-                        "feature": lf_data.get("feature", ""),
-                        "code_generation_activity_count": lf_data.get("code_generation_activity_count", 0),
-                        "code_acceptance_activity_count": lf_data.get("code_acceptance_activity_count", 0),
-                        "loc_suggested_to_add_sum": lf_data.get("loc_suggested_to_add_sum", 0),
-                        "loc_suggested_to_delete_sum": lf_data.get("loc_suggested_to_delete_sum", 0),
-                        "loc_added_sum": lf_data.get("loc_added_sum", 0),
-                        "loc_deleted_sum": lf_data.get("loc_deleted_sum", 0),
-                    }
-                )
+    CODE_COMPLETION_SUMMARY_HEADERS = (
+        "report_start_day",
+        "report_end_day",
+        "day",
+        "enterprise_id",
+        "user_id",
+        "user_login",
+        "code_completion_code_generation_count",
+        "code_completion_code_acceptance_count",
+        "code_completion_loc_suggested_to_add_sum",
+        "code_completion_loc_added_sum",
+        "code_completion_acceptance_rate",
+        "code_completion_loc_acceptance_rate",
+    )
 
-        self._write_csv(output_file, headers, rows)
-        return output_file
+    CHAT_LOC_SUMMARY_HEADERS = (
+        "report_start_day",
+        "report_end_day",
+        "day",
+        "enterprise_id",
+        "user_id",
+        "user_login",
+        "total_loc_added_sum",
+        "code_completion_loc_added_sum",
+        "chat_loc_added_sum",
+    )
 
-    def export_by_language_model(self, output_file: Path) -> Path:
-        print("\n📊 导出编程语言 + 模型维度统计...")
-        headers = [
-            "report_start_day",
-            "report_end_day",
-            "day",
-            "enterprise_id",
-            "user_id",
-            "user_login",
-            "language",
-            "model",
-            "code_generation_activity_count",
-            "code_acceptance_activity_count",
-            "loc_suggested_to_add_sum",
-            "loc_suggested_to_delete_sum",
-            "loc_added_sum",
-            "loc_deleted_sum",
-        ]
-
-        rows: List[Dict[str, Any]] = []
-        for record in self.data:
-            for lm_data in record.get("totals_by_language_model", []):
-                rows.append(
-                    {
-                        "report_start_day": record.get("report_start_day", ""),
-                        "report_end_day": record.get("report_end_day", ""),
-                        "day": record.get("day", ""),
-                        "enterprise_id": record.get("enterprise_id", ""),
-                        "user_id": record.get("user_id", ""),
-                        "user_login": record.get("user_login", ""),
-                        "language": lm_data.get("language", ""),
-                        "model": lm_data.get("model", ""),
-                        "code_generation_activity_count": lm_data.get("code_generation_activity_count", 0),
-                        "code_acceptance_activity_count": lm_data.get("code_acceptance_activity_count", 0),
-                        "loc_suggested_to_add_sum": lm_data.get("loc_suggested_to_add_sum", 0),
-                        "loc_suggested_to_delete_sum": lm_data.get("loc_suggested_to_delete_sum", 0),
-                        "loc_added_sum": lm_data.get("loc_added_sum", 0),
-                        "loc_deleted_sum": lm_data.get("loc_deleted_sum", 0),
-                    }
-                )
+    # 合并导出时每批交给写线程的行数，以及允许排队的最大批次数
+    CSV_BATCH_ROWS = 4096
+    CSV_MAX_PENDING_BATCHES = 8
+
+    # CSV 导出：名称 -> (提示信息, 表头, 按单个用户记录生成数据行的方法)
+    CSV_EXPORTS = {
+        "user_summary": (
+            "\n📊 导出用户总体指标（按用户汇总）...",
+            USER_SUMMARY_HEADERS,
+            "_user_summary_rows",
+        ),
+        "by_ide": (
+            "\n📊 导出 IDE 维度统计...",
+            BY_IDE_HEADERS,
+            "_by_ide_rows",
+        ),
+        "by_feature": (
+            "\n📊 导出功能维度统计...",
+            BY_FEATURE_HEADERS,
+            "_by_feature_rows",
+        ),
+        "by_language_feature": (
+            "\n📊 导出编程语言 + 功能维度统计...",
+            BY_LANGUAGE_FEATURE_HEADERS,
+            "_by_language_feature_rows",
+        ),
+        "by_language_model": (
+            "\n📊 导出编程语言 + 模型维度统计...",
+            BY_LANGUAGE_MODEL_HEADERS,
+            "_by_language_model_rows",
+        ),
+        "by_model_feature": (
+            "\n📊 导出模型 + 功能维度统计...",
+            BY_MODEL_FEATURE_HEADERS,
+            "_by_model_feature_rows",
+        ),
+        "code_completion_summary": (
+            "\n📊 导出 Code Completion 专项统计...",
+            CODE_COMPLETION_SUMMARY_HEADERS,
+            "_code_completion_summary_rows",
+        ),
+        "chat_loc_summary": (
+            "\n📊 导出 Chat 生成代码行数统计...",
+            CHAT_LOC_SUMMARY_HEADERS,
+            "_chat_loc_summary_rows",
+        ),
+    }
 
-        self._write_csv(output_file, headers, rows)
-        return output_file
+    def export_user_summary(self, output_file: Path) -> Path:
+        return self._export_csv("user_summary", output_file)
+
+    def _user_summary_rows(self, record: Dict[str, Any]) -> Iterator[Tuple[Any, ...]]:
+        cc_metrics = self._extract_feature_metrics(record, "code_completion")
+        cc_code_gen = cc_metrics.get("code_generation_activity_count", 0)
+        cc_code_accept = cc_metrics.get("code_acceptance_activity_count", 0)
+        cc_loc_suggested = cc_metrics.get("loc_suggested_to_add_sum", 0)
+        cc_loc_added = cc_metrics.get("loc_added_sum", 0)
+
+        # 提取 chat_panel_ask_mode 相关指标
+        ask_metrics = self._extract_feature_metrics(record, "chat_panel_ask_mode")
+        ask_interaction = ask_metrics.get("user_initiated_interaction_count", 0)
+        ask_acceptance = ask_metrics.get("code_acceptance_activity_count", 0)
+        ask_loc_suggested = ask_metrics.get("loc_suggested_to_add_sum", 0)
+        ask_loc_added = ask_metrics.get("loc_added_sum", 0)
+
+        # 提取 chat_panel_agent_mode 相关指标
+        agent_mode_metrics = self._extract_feature_metrics(record, "chat_panel_agent_mode")
+        agent_mode_loc_suggested = agent_mode_metrics.get("loc_suggested_to_add_sum", 0)
+        agent_mode_loc_added = agent_mode_metrics.get("loc_added_sum", 0)
+
+        # 提取 agent_edit 相关指标
+        agent_edit_metrics = self._extract_feature_metrics(record, "agent_edit")
+        agent_edit_loc_added = agent_edit_metrics.get("loc_added_sum", 0)
+        agent_edit_loc_deleted = agent_edit_metrics.get("loc_deleted_sum", 0)
+
+        yield (
+            record.get("user_login", ""),
+            record.get("report_start_day", ""),
+            record.get("report_end_day", ""),
+            cc_code_gen,
+            cc_code_accept,
+            cc_loc_suggested,
+            cc_loc_added,
+            ask_interaction,
+            ask_acceptance,
+            ask_loc_suggested,
+            ask_loc_added,
+            agent_mode_loc_suggested,
+            agent_mode_loc_added,
+            agent_edit_loc_added,
+            agent_edit_loc_deleted,
+        )
 
-    def export_by_model_feature(self, output_file: Path) -> Path:
-        print("\n📊 导出模型 + 功能维度统计...")
-        headers = [
-            "report_start_day",
-            "report_end_day",
-            "day",
-            "enterprise_id",
-            "user_id",
-            "user_login",
-            "model",
-            "feature",
-            "user_initiated_interaction_count",
-            "code_generation_activity_count",
-            "code_acceptance_activity_count",
-            "loc_suggested_to_add_sum",
-            "loc_suggested_to_delete_sum",
-            "loc_added_sum",
-            "loc_deleted_sum",
-        ]
-
-        rows: List[Dict[str, Any]] = []
-        for record in self.data:
-            for mf_data in record.get("totals_by_model_feature", []):
-                rows.append(
-                    {
-                        "report_start_day": record.get("report_start_day", ""),
-                        "report_end_day": record.get("report_end_day", ""),
-                        "day": record.get("day", ""),
-                        "enterprise_id": record.get("enterprise_id", ""),
-                        "user_id": record.get("user_id", ""),
-                        "user_login": record.get("user_login", ""),
-                        "model": mf_data.get("model", ""),
-                        "feature": mf_data.get("feature", ""),
-                        "user_initiated_interaction_count": mf_data.get("user_initiated_interaction_count", 0),
-                        "code_generation_activity_count": mf_data.get("code_generation_activity_count", 0),
-                        "code_acceptance_activity_count": mf_data.get("code_acceptance_activity_count", 0),
-                        "loc_suggested_to_add_sum": mf_data.get("loc_suggested_to_add_sum", 0),
-                        "loc_suggested_to_delete_sum": mf_data.get("loc_suggested_to_delete_sum", 0),
-                        "loc_added_sum": mf_data.get("loc_added_sum", 0),
-                        "loc_deleted_sum": mf_data.get("loc_deleted_sum", 0),
-                    }
-                )
+    def export_by_ide(self, output_file: Path) -> Path:
+        return self._export_csv("by_ide", output_file)
+
+    def _by_ide_rows(self, record: Dict[str, Any]) -> Iterator[Tuple[Any, ...]]:
+        base = self._base_tuple(record)
+        for ide_data in record.get("totals_by_ide", []):
+            plugin_info = ide_data.get("last_known_plugin_version") or {}
+            ide_version_info = ide_data.get("last_known_ide_version") or {}
+            yield base + (
+                ide_data.get("ide", ""),
+                ide_data.get("user_initiated_interaction_count", 0),
+                ide_data.get("code_generation_activity_count", 0),
+                ide_data.get("code_acceptance_activity_count", 0),
+                ide_data.get("loc_suggested_to_add_sum", 0),
+                ide_data.get("loc_suggested_to_delete_sum", 0),
+                ide_data.get("loc_added_sum", 0),
+                ide_data.get("loc_deleted_sum", 0),
+                plugin_info.get("plugin", ""),
+                plugin_info.get("plugin_version", ""),
+                plugin_info.get("sampled_at", ""),
+                ide_version_info.get("ide_version", ""),
+                ide_version_info.get("sampled_at", ""),
+            )
 
-        self._write_csv(output_file, headers, rows)
-        return output_file
+    def export_by_feature(self, output_file: Path) -> Path:
+        return self._export_csv("by_feature", output_file)
+
+    def _by_feature_rows(self, record: Dict[str, Any]) -> Iterator[Tuple[Any, ...]]:
+        base = self._base_tuple(record)
+        for feature_data in record.get("totals_by_feature", []):
+            yield base + (
+                feature_data.get("feature", ""),
+                feature_data.get("user_initiated_interaction_count", 0),
+                feature_data.get("code_generation_activity_count", 0),
+                feature_data.get("code_acceptance_activity_count", 0),
+                feature_data.get("loc_suggested_to_add_sum", 0),
+                feature_data.get("loc_suggested_to_delete_sum", 0),
+                feature_data.get("loc_added_sum", 0),
+                feature_data.get("loc_deleted_sum", 0),
+            )
 
-    def export_code_completion_summary(self, output_file: Path) -> Path:
-        print("\n📊 导出 Code Completion 专项统计...")
-        headers = [
-            "report_start_day",
-            "report_end_day",
-            "day",
-            "enterprise_id",
-            "user_id",
-            "user_login",
-            "code_completion_code_generation_count",
-            "code_completion_code_acceptance_count",
-            "code_completion_loc_suggested_to_add_sum",
-            "code_completion_loc_added_sum",
-            "code_completion_acceptance_rate",
-            "code_completion_loc_acceptance_rate",
-        ]
-
-        rows: List[Dict[str, Any]] = []
-        for record in self.data:
-            cc_metrics = self._extract_feature_metrics(record, "code_completion")
-            code_gen = cc_metrics.get("code_generation_activity_count", 0)
-            code_accept = cc_metrics.get("code_acceptance_activity_count", 0)
-            loc_suggested = cc_metrics.get("loc_suggested_to_add_sum", 0)
-            loc_added = cc_metrics.get("loc_added_sum", 0)
-
-            rows.append(
-                {
-                    "report_start_day": record.get("report_start_day", ""),
-                    "report_end_day": record.get("report_end_day", ""),
-                    "day": record.get("day", ""),
-                    "enterprise_id": record.get("enterprise_id", ""),
-                    "user_id": record.get("user_id", ""),
-                    "user_login": record.get("user_login", ""),
-                    "code_completion_code_generation_count": code_gen,
-                    "code_completion_code_acceptance_count": code_accept,
-                    "code_completion_loc_suggested_to_add_sum": loc_suggested,
-                    "code_completion_loc_added_sum": loc_added,
-                    "code_completion_acceptance_rate": self._calculate_rate(code_accept, code_gen),
-                    "code_completion_loc_acceptance_rate": self._calculate_rate(loc_added, loc_suggested),
-                }
+    def export_by_language_feature(self, output_file: Path) -> Path:
+        return self._export_csv("by_language_feature", output_file)
+
+    def _by_language_feature_rows(self, record: Dict[str, Any]) -> Iterator[Tuple[Any, ...]]:
+        base = self._base_tuple(record)
+        for lf_data in record.get("totals_by_language_feature", []):
+            yield base + (
+                lf_data.get("language", ""),
+                lf_data.get("feature", ""),
+                lf_data.get("code_generation_activity_count", 0),
+                lf_data.get("code_acceptance_activity_count", 0),
+                lf_data.get("loc_suggested_to_add_sum", 0),
+                lf_data.get("loc_suggested_to_delete_sum", 0),
+                lf_data.get("loc_added_sum", 0),
+                lf_data.get("loc_deleted_sum", 0),
             )
 
-        self._write_csv(output_file, headers, rows)
-        return output_file
+    def export_by_language_model(self, output_file: Path) -> Path:
+        return self._export_csv("by_language_model", output_file)
+
+    def _by_language_model_rows(self, record: Dict[str, Any]) -> Iterator[Tuple[Any, ...]]:
+        base = self._base_tuple(record)
+        for lm_data in record.get("totals_by_language_model", []):
+            yield base + (
+                lm_data.get("language", ""),
+                lm_data.get("model", ""),
+                lm_data.get("code_generation_activity_count", 0),
+                lm_data.get("code_acceptance_activity_count", 0),
+                lm_data.get("loc_suggested_to_add_sum", 0),
+                lm_data.get("loc_suggested_to_delete_sum", 0),
+                lm_data.get("loc_added_sum", 0),
+                lm_data.get("loc_deleted_sum", 0),
+            )
 
-    def export_chat_loc_summary(self, output_file: Path) -> Path:
-        print("\n📊 导出 Chat 生成代码行数统计...")
-        headers = [
-            "report_start_day",
-            "report_end_day",
-            "day",
-            "enterprise_id",
-            "user_id",
-            "user_login",
-            "total_loc_added_sum",
-            "code_completion_loc_added_sum",
-            "chat_loc_added_sum",
-        ]
-
-        rows: List[Dict[str, Any]] = []
-        for record in self.data:
-            cc_metrics = self._extract_feature_metrics(record, "code_completion")
-            cc_loc_added = cc_metrics.get("loc_added_sum", 0)
-            total_loc = self._sum_loc_added_from_ide(record)
-            chat_loc = max(total_loc - cc_loc_added, 0)
-
-            rows.append(
-                {
-                    "report_start_day": record.get("report_start_day", ""),
-                    "report_end_day": record.get("report_end_day", ""),
-                    "day": record.get("day", ""),
-                    "enterprise_id": record.get("enterprise_id", ""),
-                    "user_id": record.get("user_id", ""),
-                    "user_login": record.get("user_login", ""),
-                    "total_loc_added_sum": total_loc,
-                    "code_completion_loc_added_sum": cc_loc_added,
-                    "chat_loc_added_sum": chat_loc,
-                }
+    def export_by_model_feature(self, output_file: Path) -> Path:
+        return self._export_csv("by_model_feature", output_file)
+
+    def _by_model_feature_rows(self, record: Dict[str, Any]) -> Iterator[Tuple[Any, ...]]:
+        base = self._base_tuple(record)
+        for mf_data in record.get("totals_by_model_feature", []):
+            yield base + (
+                mf_data.get("model", ""),
+                mf_data.get("feature", ""),
+                mf_data.get("user_initiated_interaction_count", 0),
+                mf_data.get("code_generation_activity_count", 0),
+                mf_data.get("code_acceptance_activity_count", 0),
+                mf_data.get("loc_suggested_to_add_sum", 0),
+                mf_data.get("loc_suggested_to_delete_sum", 0),
+                mf_data.get("loc_added_sum", 0),
+                mf_data.get("loc_deleted_sum", 0),
             )
 
-        self._write_csv(output_file, headers, rows)
-        return output_file
+    def export_code_completion_summary(self, output_file: Path) -> Path:
+        return self._export_csv("code_completion_summary", output_file)
+
+    def _code_completion_summary_rows(self, record: Dict[str, Any]) -> Iterator[Tuple[Any, ...]]:
+        base = self._base_tuple(record)
+        cc_metrics = self._extract_feature_metrics(record, "code_completion")
+        code_gen = cc_metrics.get("code_generation_activity_count", 0)
+        code_accept = cc_metrics.get("code_acceptance_activity_count", 0)
+        loc_suggested = cc_metrics.get("loc_suggested_to_add_sum", 0)
+        loc_added = cc_metrics.get("loc_added_sum", 0)
+
+        yield base + (
+            code_gen,
+            code_accept,
+            loc_suggested,
+            loc_added,
+            self._calculate_rate(code_accept, code_gen),
+            self._calculate_rate(loc_added, loc_suggested),
+        )
+
+    def export_chat_loc_summary(self, output_file: Path) -> Path:
+        return self._export_csv("chat_loc_summary", output_file)
+
+    def _chat_loc_summary_rows(self, record: Dict[str, Any]) -> Iterator[Tuple[Any, ...]]:
+        base = self._base_tuple(record)
+        cc_metrics = self._extract_feature_metrics(record, "code_completion")
+        cc_loc_added = cc_metrics.get("loc_added_sum", 0)
+        total_loc = self._sum_loc_added_from_ide(record)
+        chat_loc = max(total_loc - cc_loc_added, 0)
+
+        yield base + (
+            total_loc,
+            cc_loc_added,
+            chat_loc,
+        )
 
     # ------------------------------------------------------------------
     # HTML Report Generation
     # ------------------------------------------------------------------
-    def generate_html_report(self, output_file: Path) -> Path:
-        """生成 HTML 格式的可视化报告"""
-        print(f"📄 正在生成 HTML 报告: {output_file.name}")
-        
-        html_content = f"""<!DOCTYPE html>
+    # 报告中不含动态内容的 <head> 部分（含样式表），保持为普通字符串以免逐一转义花括号
+    HTML_HEAD = """<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>GitHub Copilot Metrics 报告</title>
     <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Helvetica Neue', Arial, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             padding: 20px;
             line-height: 1.6;
             color: #24292e;
-        }}
-        .container {{
+        }
+        .container {
             max-width: 1400px;
             margin: 0 auto;
             background: white;
             padding: 40px;
             border-radius: 12px;
             box-shadow: 0 10px 40px rgba(0,0,0,0.2);
-        }}
-        .header {{
+        }
+        .header {
             text-align: center;
             margin-bottom: 40px;
             padding-bottom: 20px;
             border-bottom: 3px solid #0969da;
-        }}
-        .header h1 {{
+        }
+        .header h1 {
             color: #24292e;
             font-size: 36px;
             margin-bottom: 10px;
-        }}
-        .header .subtitle {{
+        }
+        .header .subtitle {
             color: #57606a;
             font-size: 16px;
-        }}
-        .info-box {{
+        }
+        .info-box {
             background: linear-gradient(135deg, #f6f8fa 0%, #e1e4e8 100%);
             padding: 20px;
             border-radius: 8px;
@@ -722,69 +724,69 @@ class CopilotMetricsConverter:
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 15px;
-        }}
-        .info-item {{
+        }
+        .info-item {
             display: flex;
             flex-direction: column;
-        }}
-        .info-label {{
+        }
+        .info-label {
             font-size: 12px;
             color: #57606a;
             font-weight: 600;
             text-transform: uppercase;
             margin-bottom: 5px;
-        }}
-        .info-value {{
+        }
+        .info-value {
             font-size: 18px;
             color: #24292e;
             font-weight: bold;
-        }}
-        h2 {{
+        }
+        h2 {
             color: #0969da;
             margin: 40px 0 20px;
             padding-left: 15px;
             border-left: 5px solid #0969da;
             font-size: 24px;
-        }}
-        .metrics-grid {{
+        }
+        .metrics-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
             gap: 20px;
             margin: 20px 0;
-        }}
-        .metric-card {{
+        }
+        .metric-card {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 25px;
             border-radius: 10px;
             box-shadow: 0 4px 15px rgba(0,0,0,0.1);
             transition: transform 0.2s;
-        }}
-        .metric-card:hover {{
+        }
+        .metric-card:hover {
             transform: translateY(-5px);
             box-shadow: 0 6px 20px rgba(0,0,0,0.15);
-        }}
-        .metric-card.green {{ background: linear-gradient(135deg, #56ab2f 0%, #a8e063 100%); }}
-        .metric-card.blue {{ background: linear-gradient(135deg, #2193b0 0%, #6dd5ed 100%); }}
-        .metric-card.orange {{ background: linear-gradient(135deg, #f2994a 0%, #f2c94c 100%); }}
-        .metric-card.red {{ background: linear-gradient(135deg, #eb3349 0%, #f45c43 100%); }}
-        .metric-card.purple {{ background: linear-gradient(135deg, #8e2de2 0%, #4a00e0 100%); }}
-        .metric-icon {{
+        }
+        .metric-card.green { background: linear-gradient(135deg, #56ab2f 0%, #a8e063 100%); }
+        .metric-card.blue { background: linear-gradient(135deg, #2193b0 0%, #6dd5ed 100%); }
+        .metric-card.orange { background: linear-gradient(135deg, #f2994a 0%, #f2c94c 100%); }
+        .metric-card.red { background: linear-gradient(135deg, #eb3349 0%, #f45c43 100%); }
+        .metric-card.purple { background: linear-gradient(135deg, #8e2de2 0%, #4a00e0 100%); }
+        .metric-icon {
             font-size: 32px;
             margin-bottom: 10px;
-        }}
-        .metric-value {{
+        }
+        .metric-value {
             font-size: 42px;
             font-weight: bold;
             margin: 10px 0;
             text-shadow: 2px 2px 4px rgba(0,0,0,0.2);
-        }}
-        .metric-label {{
+        }
+        .metric-label {
             font-size: 14px;
             opacity: 0.95;
             font-weight: 500;
-        }}
-        table {{
+        }
+        table {
             width: 100%;
             border-collapse: collapse;
             margin: 20px 0;
@@ -792,26 +794,26 @@ class CopilotMetricsConverter:
             box-shadow: 0 2px 8px rgba(0,0,0,0.05);
             border-radius: 8px;
             overflow: hidden;
-        }}
-        th, td {{
+        }
+        th, td {
             padding: 14px;
             text-align: left;
-        }}
-        th {{
+        }
+        th {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             font-weight: 600;
             font-size: 13px;
             text-transform: uppercase;
             letter-spacing: 0.5px;
-        }}
-        td {{
+        }
+        td {
             border-bottom: 1px solid #e1e4e8;
-        }}
-        tr:hover td {{
+        }
+        tr:hover td {
             background: #f6f8fa;
-        }}
-        .rank {{
+        }
+        .rank {
             background: linear-gradient(135deg, #f2994a 0%, #f2c94c 100%);
             color: white;
             width: 35px;
@@ -822,18 +824,18 @@ class CopilotMetricsConverter:
             justify-content: center;
             font-weight: bold;
             box-shadow: 0 2px 6px rgba(0,0,0,0.2);
-        }}
-        .rank.gold {{ background: linear-gradient(135deg, #FFD700 0%, #FFA500 100%); }}
-        .rank.silver {{ background: linear-gradient(135deg, #C0C0C0 0%, #808080 100%); }}
-        .rank.bronze {{ background: linear-gradient(135deg, #CD7F32 0%, #8B4513 100%); }}
-        .progress-bar {{
+        }
+        .rank.gold { background: linear-gradient(135deg, #FFD700 0%, #FFA500 100%); }
+        .rank.silver { background: linear-gradient(135deg, #C0C0C0 0%, #808080 100%); }
+        .rank.bronze { background: linear-gradient(135deg, #CD7F32 0%, #8B4513 100%); }
+        .progress-bar {
             background: #e1e4e8;
             height: 24px;
             border-radius: 12px;
             overflow: hidden;
             position: relative;
-        }}
-        .progress-fill {{
+        }
+        .progress-fill {
             background: linear-gradient(90deg, #56ab2f, #a8e063);
             height: 100%;
             display: flex;
@@ -844,8 +846,8 @@ class CopilotMetricsConverter:
             font-weight: bold;
             transition: width 0.3s ease;
             position: relative;
-        }}
-        .progress-fill::after {{
+        }
+        .progress-fill::after {
             content: '';
             position: absolute;
             top: 0;
@@ -854,57 +856,63 @@ class CopilotMetricsConverter:
             bottom: 0;
             background: linear-gradient(90deg, transparent, rgba(255,255,255,0.3), transparent);
             animation: shimmer 2s infinite;
-        }}
-        @keyframes shimmer {{
-            0% {{ transform: translateX(-100%); }}
-            100% {{ transform: translateX(100%); }}
-        }}
-        .badge {{
+        }
+        @keyframes shimmer {
+            0% { transform: translateX(-100%); }
+            100% { transform: translateX(100%); }
+        }
+        .badge {
             display: inline-block;
             padding: 4px 10px;
             border-radius: 12px;
             font-size: 12px;
             font-weight: 600;
             margin: 0 5px;
-        }}
-        .badge.success {{ background: #2ea44f; color: white; }}
-        .badge.warning {{ background: #fb8500; color: white; }}
-        .badge.info {{ background: #0969da; color: white; }}
-        .stats-row {{
+        }
+        .badge.success { background: #2ea44f; color: white; }
+        .badge.warning { background: #fb8500; color: white; }
+        .badge.info { background: #0969da; color: white; }
+        .stats-row {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
             gap: 15px;
             margin: 20px 0;
-        }}
-        .stat-box {{
+        }
+        .stat-box {
             background: #f6f8fa;
             padding: 15px;
             border-radius: 8px;
             text-align: center;
             border: 2px solid #e1e4e8;
-        }}
-        .stat-box .number {{
+        }
+        .stat-box .number {
             font-size: 28px;
             font-weight: bold;
             color: #0969da;
             margin-bottom: 5px;
-        }}
-        .stat-box .label {{
+        }
+        .stat-box .label {
             font-size: 12px;
             color: #57606a;
             font-weight: 600;
-        }}
-        .footer {{
+        }
+        .footer {
             text-align: center;
             margin-top: 50px;
             padding-top: 20px;
             border-top: 2px solid #e1e4e8;
             color: #57606a;
             font-size: 14px;
-        }}
+        }
     </style>
 </head>
-<body>
+"""
+
+    def generate_html_report(self, output_file: Path) -> Path:
+        """生成 HTML 格式的可视化报告"""
+        self._emit(f"📄 正在生成 HTML 报告: {output_file.name}")
+        
+        html_body = f"""<body>
     <div class="container">
         <div class="header">
             <h1>📊 GitHub Copilot Metrics 使用报告</h1>
@@ -941,30 +949,38 @@ class CopilotMetricsConverter:
 </html>
 """
         
-        output_file.write_text(html_content, encoding='utf-8')
-        print(f"   ✅ HTML 报告已生成")
+        # 静态头部与动态正文依次写出，无需先拼接成完整的报告字符串
+        with output_file.open("w", encoding="utf-8") as handle:
+            handle.writelines((self.HTML_HEAD, html_body))
+        self._emit("   ✅ HTML 报告已生成")
         return output_file
 
     def _get_date_range(self) -> str:
-        """获取数据的日期范围"""
-        if not self.data:
-            return "N/A"
-        start = min(d.get("report_start_day", "") for d in self.data if d.get("report_start_day"))
-        end = max(d.get("report_end_day", "") for d in self.data if d.get("report_end_day"))
-        return f"{start} ~ {end}"
+        """获取数据的日期范围（控制台摘要和 HTML 报告共用，首次调用后缓存）"""
+        if self._date_range is None:
+            if not self.data:
+                self._date_range = "N/A"
+            else:
+                start = min(d.get("report_start_day", "") for d in self.data if d.get("report_start_day"))
+                end = max(d.get("report_end_day", "") for d in self.data if d.get("report_end_day"))
+                self._date_range = f"{start} ~ {end}"
+        return self._date_range
 
     def _get_current_time(self) -> str:
         """获取当前时间"""
-        from datetime import datetime
         return datetime.now().strftime("%Y-%m-%d %H:%M")
 
     def _generate_overall_metrics_html(self) -> str:
         """生成整体指标的 HTML"""
-        total_generations = sum(d.get("code_generation_activity_count", 0) for d in self.data)
-        total_acceptances = sum(d.get("code_acceptance_activity_count", 0) for d in self.data)
-        total_loc_added = sum(d.get("loc_added_sum", 0) for d in self.data)
-        total_interactions = sum(d.get("user_initiated_interaction_count", 0) for d in self.data)
-        total_loc_suggested = sum(d.get("loc_suggested_to_add_sum", 0) for d in self.data)
+        # 单次遍历同时累计各项总数
+        total_generations = total_acceptances = total_loc_added = total_interactions = total_loc_suggested = 0
+        for d in self.data:
+            get = d.get
+            total_generations += get("code_generation_activity_count", 0)
+            total_acceptances += get("code_acceptance_activity_count", 0)
+            total_loc_added += get("loc_added_sum", 0)
+            total_interactions += get("user_initiated_interaction_count", 0)
+            total_loc_suggested += get("loc_suggested_to_add_sum", 0)
         overall_acceptance = (total_acceptances / total_generations * 100) if total_generations > 0 else 0
         
         return f"""
@@ -1005,9 +1021,13 @@ class CopilotMetricsConverter:
 
     def _generate_feature_adoption_html(self) -> str:
         """生成功能采用情况的 HTML"""
-        used_agent = sum(1 for d in self.data if d.get("used_agent"))
-        used_chat = sum(1 for d in self.data if d.get("used_chat"))
-        used_both = sum(1 for d in self.data if d.get("used_agent") and d.get("used_chat"))
+        used_agent = used_chat = used_both = 0
+        for d in self.data:
+            agent = bool(d.get("used_agent"))
+            chat = bool(d.get("used_chat"))
+            used_agent += agent
+            used_chat += chat
+            used_both += agent and chat
         total_users = len(self.data)
         
         agent_percent = (used_agent / total_users * 100) if total_users > 0 else 0
@@ -1053,9 +1073,9 @@ class CopilotMetricsConverter:
 
     def _generate_top_users_html(self) -> str:
         """生成 TOP 用户排行的 HTML"""
-        top_users = sorted(self.data, key=lambda x: x.get("code_generation_activity_count", 0), reverse=True)[:15]
+        top_users = heapq.nlargest(15, self.data, key=lambda x: x.get("code_generation_activity_count", 0))
         
-        rows = ""
+        rows = []
         for i, user in enumerate(top_users, 1):
             username = user.get("user_login", "Unknown")
             generations = user.get("code_generation_activity_count", 0)
@@ -1078,7 +1098,7 @@ class CopilotMetricsConverter:
             if user.get("used_chat"):
                 badges += '<span class="badge success">Chat</span>'
             
-            rows += f"""
+            rows.append(f"""
             <tr>
                 <td><span class="rank {rank_class}">{i}</span></td>
                 <td><strong>{username}</strong> {badges}</td>
@@ -1092,7 +1112,7 @@ class CopilotMetricsConverter:
                 <td>{loc:,}</td>
                 <td>{interactions:,}</td>
             </tr>
-            """
+            """)
         
         return f"""
         <h2>🏆 TOP 15 最活跃用户</h2>
@@ -1109,42 +1129,39 @@ class CopilotMetricsConverter:
                 </tr>
             </thead>
             <tbody>
-                {rows}
+                {"".join(rows)}
             </tbody>
         </table>
         """
 
     def _generate_ide_stats_html(self) -> str:
         """生成 IDE 统计的 HTML"""
-        ide_stats = {}
+        # ide → [用户集合, 代码生成次数, 代码接受次数, 新增代码行数]
+        ide_stats: Dict[str, List[Any]] = {}
         
         for record in self.data:
+            user_login = record.get("user_login")
             for ide_data in record.get("totals_by_ide", []):
                 ide = ide_data.get("ide", "unknown")
-                if ide not in ide_stats:
-                    ide_stats[ide] = {
-                        "users": set(),
-                        "generations": 0,
-                        "acceptances": 0,
-                        "loc_added": 0
-                    }
-                ide_stats[ide]["users"].add(record.get("user_login"))
-                ide_stats[ide]["generations"] += ide_data.get("code_generation_activity_count", 0)
-                ide_stats[ide]["acceptances"] += ide_data.get("code_acceptance_activity_count", 0)
-                ide_stats[ide]["loc_added"] += ide_data.get("loc_added_sum", 0)
+                stats = ide_stats.get(ide)
+                if stats is None:
+                    stats = ide_stats[ide] = [set(), 0, 0, 0]
+                stats[0].add(user_login)
+                stats[1] += ide_data.get("code_generation_activity_count", 0)
+                stats[2] += ide_data.get("code_acceptance_activity_count", 0)
+                stats[3] += ide_data.get("loc_added_sum", 0)
         
         if not ide_stats:
             return ""
         
-        rows = ""
-        for ide, stats in sorted(ide_stats.items(), key=lambda x: x[1]["generations"], reverse=True):
-            user_count = len(stats["users"])
-            generations = stats["generations"]
-            acceptances = stats["acceptances"]
-            loc_added = stats["loc_added"]
+        rows = []
+        for ide, (users, generations, acceptances, loc_added) in sorted(
+            ide_stats.items(), key=lambda x: x[1][1], reverse=True
+        ):
+            user_count = len(users)
             rate = (acceptances / generations * 100) if generations > 0 else 0
             
-            rows += f"""
+            rows.append(f"""
             <tr>
                 <td><strong>{ide.upper()}</strong></td>
                 <td>{user_count}</td>
@@ -1157,7 +1174,7 @@ class CopilotMetricsConverter:
                 </td>
                 <td>{loc_added:,}</td>
             </tr>
-            """
+            """)
         
         return f"""
         <h2>💻 IDE 使用统计</h2>
@@ -1173,44 +1190,39 @@ class CopilotMetricsConverter:
                 </tr>
             </thead>
             <tbody>
-                {rows}
+                {"".join(rows)}
             </tbody>
         </table>
         """
 
     def _generate_language_stats_html(self) -> str:
         """生成编程语言统计的 HTML"""
-        lang_stats = {}
+        # language → [代码生成次数, 代码接受次数, 新增代码行数]
+        lang_stats: Dict[str, List[int]] = {}
         
         for record in self.data:
             for lang_data in record.get("totals_by_language_feature", []):
                 lang = lang_data.get("language", "unknown")
                 if lang == "unknown":
                     continue
-                if lang not in lang_stats:
-                    lang_stats[lang] = {
-                        "generations": 0,
-                        "acceptances": 0,
-                        "loc_added": 0
-                    }
-                lang_stats[lang]["generations"] += lang_data.get("code_generation_activity_count", 0)
-                lang_stats[lang]["acceptances"] += lang_data.get("code_acceptance_activity_count", 0)
-                lang_stats[lang]["loc_added"] += lang_data.get("loc_added_sum", 0)
+                stats = lang_stats.get(lang)
+                if stats is None:
+                    stats = lang_stats[lang] = [0, 0, 0]
+                stats[0] += lang_data.get("code_generation_activity_count", 0)
+                stats[1] += lang_data.get("code_acceptance_activity_count", 0)
+                stats[2] += lang_data.get("loc_added_sum", 0)
         
         if not lang_stats:
             return ""
         
         # 只显示前10个最常用的语言
-        top_langs = sorted(lang_stats.items(), key=lambda x: x[1]["generations"], reverse=True)[:10]
+        top_langs = heapq.nlargest(10, lang_stats.items(), key=lambda x: x[1][0])
         
-        rows = ""
-        for lang, stats in top_langs:
-            generations = stats["generations"]
-            acceptances = stats["acceptances"]
-            loc_added = stats["loc_added"]
+        rows = []
+        for lang, (generations, acceptances, loc_added) in top_langs:
             rate = (acceptances / generations * 100) if generations > 0 else 0
             
-            rows += f"""
+            rows.append(f"""
             <tr>
                 <td><strong>{lang}</strong></td>
                 <td>{generations:,}</td>
@@ -1222,7 +1234,7 @@ class CopilotMetricsConverter:
                 </td>
                 <td>{loc_added:,}</td>
             </tr>
-            """
+            """)
         
         return f"""
         <h2>🔤 编程语言统计 (TOP 10)</h2>
@@ -1237,7 +1249,7 @@ class CopilotMetricsConverter:
                 </tr>
             </thead>
             <tbody>
-                {rows}
+                {"".join(rows)}
             </tbody>
         </table>
         """
@@ -1246,20 +1258,20 @@ class CopilotMetricsConverter:
     # Shared helpers
     # ------------------------------------------------------------------
     @staticmethod
-    def _extract_feature_metrics(record: Dict[str, Any], feature_name: str) -> Dict[str, Any]:
-        for feature in record.get("totals_by_feature", []):
-            if feature.get("feature") == feature_name:
-                return feature
-        return {
-            "feature": feature_name,
-            "user_initiated_interaction_count": 0,
-            "code_generation_activity_count": 0,
-            "code_acceptance_activity_count": 0,
-            "loc_suggested_to_add_sum": 0,
-            "loc_suggested_to_delete_sum": 0,
-            "loc_added_sum": 0,
-            "loc_deleted_sum": 0,
-        }
+    def _extract_feature_metrics(record: Dict[str, Any], feature_name: str) -> Mapping[str, Any]:
+        return record["_feature_index"].get(feature_name, EMPTY_FEATURE_METRICS)
+
+    @staticmethod
+    def _base_tuple(record: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Leading report/user identity columns shared by the per-user CSV exports."""
+        return (
+            record.get("report_start_day", ""),
+            record.get("report_end_day", ""),
+            record.get("day", ""),
+            record.get("enterprise_id", ""),
+            record.get("user_id", ""),
+            record.get("user_login", ""),
+        )
 
     @staticmethod
     def _sum_loc_added_from_ide(record: Dict[str, Any]) -> int:
@@ -1271,57 +1283,134 @@ class CopilotMetricsConverter:
             return 0.0
         return round((numerator / denominator) * 100, 2)
 
-    def export_all(self, output_dir: Path = None) -> None:
-        """导出所有维度的 CSV 文件和 HTML 报告"""
-        output_dir = Path(output_dir) if output_dir else self.json_file.parent
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        print(f"\n{'='*80}")
-        print(f"🚀 GitHub Copilot Metrics 数据导出")
-        print(f"{'='*80}")
-        print(f"📂 输出目录: {output_dir}")
-        print(f"📅 数据期间: {self._get_date_range()}")
-        print(f"👥 用户总数: {len(self.data)}")
-        print(f"{'='*80}\n")
+    def export_all(self, output_dir: Path = None, output_format: str = "csv") -> None:
+        """导出所有维度的 CSV（或 Parquet）文件和 HTML 报告"""
+        output_dir = self.resolve_output_dir(output_dir)
+
+        self._emit(
+            f"\n{'='*80}",
+            "🚀 GitHub Copilot Metrics 数据导出",
+            f"{'='*80}",
+            f"📂 输出目录: {output_dir}",
+            f"📅 数据期间: {self._get_date_range()}",
+            f"👥 用户总数: {len(self.data)}",
+            f"{'='*80}\n",
+        )
 
-        base_name = self.json_file.stem
         files = []
 
-        # 导出所有 CSV 文件
-        print("📊 正在导出 CSV 文件...")
-        files.append(self.export_user_summary(output_dir / f"{base_name}_user_summary.csv"))
-        files.append(self.export_by_ide(output_dir / f"{base_name}_by_ide.csv"))
-        files.append(self.export_by_feature(output_dir / f"{base_name}_by_feature.csv"))
-        files.append(self.export_by_language_feature(output_dir / f"{base_name}_by_language_feature.csv"))
-        files.append(self.export_by_language_model(output_dir / f"{base_name}_by_language_model.csv"))
-        files.append(self.export_by_model_feature(output_dir / f"{base_name}_by_model_feature.csv"))
-        files.append(self.export_code_completion_summary(output_dir / f"{base_name}_code_completion_summary.csv"))
-        files.append(self.export_chat_loc_summary(output_dir / f"{base_name}_chat_loc_summary.csv"))
+        # 导出所有 CSV 文件（单次遍历用户数据同时写出）
+        self._emit(f"📊 正在导出 {output_format.upper()} 文件...")
+        files.extend(self._export_all_csv(output_dir, output_format))
 
         # 导出 HTML 报告
-        print("\n📊 正在生成 HTML 报告...")
-        html_file = self.generate_html_report(output_dir / f"{base_name}_report.html")
+        self._emit("\n📊 正在生成 HTML 报告...")
+        html_file = self.generate_html_report(self.output_path(output_dir, "report", ".html"))
         files.append(html_file)
 
         # 打印文件列表
-        print(f"\n{'='*80}")
-        print(f"✅ 导出完成！共生成 {len(files)} 个文件:")
-        print(f"{'='*80}")
+        lines = [f"\n{'='*80}", f"✅ 导出完成！共生成 {len(files)} 个文件:", f"{'='*80}"]
         for i, file in enumerate(files, 1):
             file_size = file.stat().st_size / 1024  # KB
             icon = "📄" if file.suffix == ".html" else "📊"
-            print(f"   {icon} {i}. {file.name} ({file_size:.2f} KB)")
-        print(f"{'='*80}\n")
-        
+            lines.append(f"   {icon} {i}. {file.name} ({file_size:.2f} KB)")
+        lines.append(f"{'='*80}\n")
+
         # 提示如何打开 HTML 报告
-        print(f"💡 提示: 在浏览器中打开 {html_file.name} 查看可视化报告\n")
+        lines.append(f"💡 提示: 在浏览器中打开 {html_file.name} 查看可视化报告\n")
+        self._emit(*lines)
+
+    def resolve_output_dir(self, output_dir: Path = None) -> Path:
+        """Return ``output_dir`` (default: the JSON file's directory), creating it if missing."""
+        output_dir = Path(output_dir) if output_dir else self.json_file.parent
+        if not output_dir.is_dir():
+            output_dir.mkdir(parents=True, exist_ok=True)
+        return output_dir
+
+    def output_path(self, output_dir: Path, name: str, suffix: str) -> Path:
+        """Return ``<output_dir>/<json stem>_<name><suffix>``."""
+        return output_dir / f"{self.base_name}_{name}{suffix}"
+
+    def _export_csv(self, name: str, output_file: Path) -> Path:
+        """Export a single CSV described by ``CSV_EXPORTS[name]``."""
+        message, headers, row_method = self.CSV_EXPORTS[name]
+        self._emit(message)
+        rows = chain.from_iterable(map(getattr(self, row_method), self.data))
+        self._write_rows(output_file, headers, rows)
+        return output_file
 
-    def _write_csv(self, output_file: Path, headers: List[str], rows: List[Dict[str, Any]]) -> None:
-        with output_file.open("w", newline="", encoding="utf-8-sig") as handle:
-            writer = csv.DictWriter(handle, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(rows)
-        print(f"   ✅ 已生成: {output_file} ({len(rows)} 行数据)")
+    def _export_all_csv(self, output_dir: Path, output_format: str = "csv") -> List[Path]:
+        """Write every table in ``CSV_EXPORTS`` during a single pass over ``self.data``."""
+        suffix = self.OUTPUT_FORMATS[output_format]
+        output_files = [self.output_path(output_dir, name, suffix) for name in self.CSV_EXPORTS]
+        row_counts = [0] * len(output_files)
+        with ExitStack() as stack:
+            targets = [
+                (self._open_output(stack, output_file, headers).writerows, getattr(self, row_method))
+                for output_file, (_, headers, row_method) in zip(output_files, self.CSV_EXPORTS.values())
+            ]
+            # 主线程生成数据行，按批交给单独的写线程写盘，使行生成与磁盘写入重叠；
+            # 单个工作线程保证各批次按提交顺序写出，未完成的批次数有上限以限制内存占用
+            writer_thread = stack.enter_context(ThreadPoolExecutor(max_workers=1))
+            pending: Deque[Future] = deque()
+
+            def submit(index: int, batch: List[Tuple[Any, ...]]) -> None:
+                row_counts[index] += len(batch)
+                pending.append(writer_thread.submit(targets[index][0], batch))
+                if len(pending) > self.CSV_MAX_PENDING_BATCHES:
+                    pending.popleft().result()
+
+            batches: List[List[Tuple[Any, ...]]] = [[] for _ in targets]
+            for record in self.data:
+                for index, (_, make_rows) in enumerate(targets):
+                    batch = batches[index]
+                    batch.extend(make_rows(record))
+                    if len(batch) >= self.CSV_BATCH_ROWS:
+                        submit(index, batch)
+                        batches[index] = []
+            for index, batch in enumerate(batches):
+                if batch:
+                    submit(index, batch)
+            for future in pending:
+                future.result()
+
+        lines = []
+        for (message, _, _), output_file, row_count in zip(self.CSV_EXPORTS.values(), output_files, row_counts):
+            lines.append(message)
+            lines.append(self._written_message(output_file, row_count))
+        self._emit(*lines)
+        return output_files
+
+    def _open_output(self, stack: ExitStack, output_file: Path, headers: Sequence[str]) -> Any:
+        """Open a row writer on ``stack`` chosen by the suffix of ``output_file``."""
+        suffix = output_file.suffix
+        if suffix == self.OUTPUT_FORMATS["parquet"]:
+            return stack.enter_context(ParquetRowWriter(output_file, headers))
+        if suffix == self.OUTPUT_FORMATS["ndjson"]:
+            return NdjsonRowWriter(stack.enter_context(output_file.open("wb", buffering=1 << 20)), headers)
+        return self._open_csv(stack, output_file, headers)
+
+    def _open_csv(self, stack: ExitStack, output_file: Path, headers: Iterable[str]) -> Any:
+        """Open ``output_file`` on ``stack`` and return a csv writer with the header row written."""
+        handle = stack.enter_context(
+            output_file.open("w", newline="", encoding=self.csv_encoding, buffering=1 << 20)
+        )
+        writer = csv.writer(handle)
+        writer.writerow(headers)
+        return writer
+
+    def _write_rows(self, output_file: Path, headers: Sequence[str], rows: Iterable[Tuple[Any, ...]]) -> None:
+        """Stream header-ordered row tuples to ``output_file``."""
+        row_counter = count()
+        with ExitStack() as stack:
+            writer = self._open_output(stack, output_file, headers)
+            # rows 耗尽时 zip 不再从计数器取值，写完后计数器的下一个值即为行数
+            writer.writerows(row for row, _ in zip(rows, row_counter))
+        self._emit(self._written_message(output_file, next(row_counter)))
+
+    @staticmethod
+    def _written_message(output_file: Path, row_count: int) -> str:
+        return f"   ✅ 已生成: {output_file} ({row_count} 行数据)"
 
 
 # ----------------------------------------------------------------------
@@ -1337,6 +1426,8 @@ def build_argument_parser() -> argparse.ArgumentParser:
   python3 json_to_csv.py input.json
   python3 json_to_csv.py input.json -o ./output
   python3 json_to_csv.py input.json -t code_completion_summary
+  python3 json_to_csv.py input.json -f parquet
+  python3 json_to_csv.py input.json -f ndjson
         """,
     )
 
@@ -1349,29 +1440,47 @@ def build_argument_parser() -> argparse.ArgumentParser:
         default="all",
         help="导出的数据类型: user_summary(用户汇总CSV), all(所有CSV+HTML), html(仅HTML报告) [默认: all]",
     )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=sorted(CopilotMetricsConverter.OUTPUT_FORMATS),
+        default="csv",
+        help="明细数据的输出格式: csv, ndjson(每行一个 JSON 对象), parquet(需要安装 pyarrow) [默认: csv]",
+    )
+    parser.add_argument(
+        "--no-bom",
+        action="store_true",
+        help="CSV 不写入 UTF-8 BOM（便于 Arrow/DuckDB 等工具读取；Excel 打开中文表头可能乱码）",
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出进度信息")
     return parser
 
 
 def main() -> None:
     parser = build_argument_parser()
     args = parser.parse_args()
+    # pyarrow 只在写 Parquet 时才导入；这里仅检查是否已安装，避免解析完 JSON 后才报错
+    if args.format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        parser.error("--format parquet 需要安装 pyarrow: pip install pyarrow")
 
-    converter = CopilotMetricsConverter(args.json_file)
+    converter = CopilotMetricsConverter(
+        args.json_file, csv_encoding="utf-8" if args.no_bom else "utf-8-sig", quiet=args.quiet
+    )
 
-    output_dir = Path(args.output_dir) if args.output_dir else converter.json_file.parent
-    output_dir.mkdir(parents=True, exist_ok=True)
+    output_dir = converter.resolve_output_dir(args.output_dir)
 
     if args.type == "all":
         # 导出所有 CSV 文件和 HTML 报告
-        converter.export_all(output_dir)
+        converter.export_all(output_dir, args.format)
     elif args.type == "html":
         # 仅导出 HTML 报告
-        html_file = converter.generate_html_report(output_dir / f"{converter.json_file.stem}_report.html")
-        print(f"\n✅ HTML 报告已生成: {html_file}")
-        print(f"💡 在浏览器中打开查看可视化报告\n")
+        html_file = converter.generate_html_report(converter.output_path(output_dir, "report", ".html"))
+        converter._emit(f"\n✅ HTML 报告已生成: {html_file}", "💡 在浏览器中打开查看可视化报告\n")
     else:
         # 仅导出用户汇总 CSV
-        converter.export_user_summary(output_dir / f"{converter.json_file.stem}_user_summary.csv")
+        converter.export_user_summary(
+            converter.output_path(output_dir, "user_summary", converter.OUTPUT_FORMATS[args.format])
+        )
 
 
 if __name__ == "__main__":